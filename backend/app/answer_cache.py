@@ -0,0 +1,157 @@
+"""비슷한 질문 재사용 캐시 ("IVV 사도 돼?" 류).
+
+키: (엔드포인트, 종목, Finnhub 데이터 버전) → 그 안에서 질문 임베딩 코사인 유사도로 검색.
+- 데이터 버전은 quote 시각/가격 → 시세가 바뀌면 자동으로 다른 그룹(이전 답변은 안 씀)
+- 항목 TTL(ANSWER_CACHE_TTL_SEC) + 전체 LRU(ANSWER_CACHE_MAX_ENTRIES)
+- 벡터는 정규화해서 array('f')로 보관(float32, 차원당 4바이트)
+"""
+import math
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import (
+    ANSWER_CACHE_TTL_SEC,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_SIM_THRESHOLD,
+    ANSWER_CACHE_EMBED_MAX_FAILURES,
+    ANSWER_CACHE_EMBED_BACKOFF_SEC,
+)
+
+GroupKey = Tuple[str, str, str]
+
+
+def data_version(bundle: Optional[Dict[str, Any]]) -> Optional[str]:
+    """quote의 마지막 체결 시각 + 현재가. 없으면 캐시 사용 안 함."""
+    quote = (bundle or {}).get("quote")
+    if not isinstance(quote, dict) or not quote.get("t"):
+        return None
+    return f"{quote.get('t')}:{quote.get('c')}"
+
+
+def normalize_question(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def _unit(vec: Sequence[float]) -> Optional[array]:
+    norm = math.sqrt(sum(x * x for x in vec))
+    if not norm:
+        return None
+    return array("f", (x / norm for x in vec))
+
+
+class _Entry:
+    __slots__ = ("group", "question", "vec", "answer", "expires_at")
+
+    def __init__(self, group: GroupKey, question: str, vec: Optional[array], answer: str, expires_at: float):
+        self.group = group
+        self.question = question
+        self.vec = vec
+        self.answer = answer
+        self.expires_at = expires_at
+
+
+class SemanticAnswerCache:
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_sec: float = ANSWER_CACHE_TTL_SEC,
+        threshold: float = ANSWER_CACHE_SIM_THRESHOLD,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.threshold = threshold
+        self._lru: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._groups: Dict[GroupKey, List[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _drop(self, entry_id: int) -> None:
+        entry = self._lru.pop(entry_id, None)
+        if entry is None:
+            return
+        ids = self._groups.get(entry.group)
+        if ids is not None:
+            ids.remove(entry_id)
+            if not ids:
+                del self._groups[entry.group]
+
+    def _live_ids(self, group: GroupKey) -> List[int]:
+        now = time.time()
+        ids = list(self._groups.get(group, ()))
+        for entry_id in ids:
+            if self._lru[entry_id].expires_at <= now:
+                self._drop(entry_id)
+        return list(self._groups.get(group, ()))
+
+    def lookup_exact(self, group: GroupKey, question: str) -> Optional[str]:
+        # 같은 문장이면 임베딩 호출 없이 바로
+        q = normalize_question(question)
+        for entry_id in self._live_ids(group):
+            entry = self._lru[entry_id]
+            if entry.question == q:
+                self._lru.move_to_end(entry_id)
+                return entry.answer
+        return None
+
+    def lookup(self, group: GroupKey, embedding: Sequence[float]) -> Optional[Tuple[str, float]]:
+        query = _unit(embedding)
+        if query is None:
+            return None
+        best_id, best_sim = None, -1.0
+        for entry_id in self._live_ids(group):
+            vec = self._lru[entry_id].vec
+            if vec is None or len(vec) != len(query):
+                continue
+            sim = sum(a * b for a, b in zip(query, vec))
+            if sim > best_sim:
+                best_id, best_sim = entry_id, sim
+        if best_id is None or best_sim < self.threshold:
+            return None
+        self._lru.move_to_end(best_id)
+        return self._lru[best_id].answer, best_sim
+
+    def put(self, group: GroupKey, question: str, embedding: Optional[Sequence[float]], answer: str) -> None:
+        entry_id = self._next_id
+        self._next_id += 1
+        vec = _unit(embedding) if embedding else None
+        self._lru[entry_id] = _Entry(group, normalize_question(question), vec, answer, time.time() + self.ttl_sec)
+        self._groups.setdefault(group, []).append(entry_id)
+        while len(self._lru) > self.max_entries:
+            oldest_id = next(iter(self._lru))
+            self._drop(oldest_id)
+
+
+class EmbedBackoff:
+    """임베딩이 연속 max_failures번 실패하면 backoff_sec 동안 호출하지 않는다.
+
+    임베딩 모델이 없으면 캐시 miss마다 실패+로그가 반복되므로, 그동안은 정확히 같은 질문만 재사용.
+    """
+
+    def __init__(
+        self,
+        max_failures: int = ANSWER_CACHE_EMBED_MAX_FAILURES,
+        backoff_sec: float = ANSWER_CACHE_EMBED_BACKOFF_SEC,
+    ) -> None:
+        self.max_failures = max_failures
+        self.backoff_sec = backoff_sec
+        self.failures = 0
+        self.until = 0.0
+
+    def allow(self) -> bool:
+        return time.time() >= self.until
+
+    def success(self) -> None:
+        self.failures = 0
+
+    def failure(self) -> bool:
+        """이번 실패로 쉬기 시작하면 True (로그 한 번만 남기는 용도)."""
+        self.failures += 1
+        if self.failures < self.max_failures:
+            return False
+        self.failures = 0
+        self.until = time.time() + self.backoff_sec
+        return True
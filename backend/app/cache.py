@@ -0,0 +1,218 @@
+"""Finnhub 응답 캐시 백엔드.
+
+CACHE_BACKEND=memory  : 프로세스 내부 dict (워커마다 따로)
+CACHE_BACKEND=sqlite  : 같은 호스트의 모든 uvicorn 워커가 공유하는 SQLite(WAL) 파일
+
+cached_fetch()는 "조회 또는 잠금"을 원자적으로 처리해서, 만료된 키를 여러 워커가 동시에 요청해도
+한 워커만 업스트림을 호출하고 나머지는 그 결과를 기다린다.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .config import CACHE_BACKEND, CACHE_SQLITE_PATH, CACHE_LOCK_TTL_SEC
+
+_PURGE_EVERY = 500  # set 이만큼마다 만료 행 정리
+
+
+class CacheBackend(ABC):
+    # 메서드가 빠진 백엔드는 첫 캐시 miss가 아니라 생성 시점에 TypeError
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, data: Any, ttl_sec: float) -> None:
+        ...
+
+    @abstractmethod
+    async def get_or_lock(self, key: str, lock_ttl: float) -> Tuple[Optional[Any], bool]:
+        """(값, 잠금획득). 값이 있으면 (값, False), 없으면 잠금을 시도해 (None, 성공여부)."""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        ...
+
+
+class SimpleTTLCache(CacheBackend):
+    def __init__(self):
+        self.store: Dict[str, Tuple[float, Any]] = {}
+        self.locks: Dict[str, float] = {}
+
+    def _get(self, key: str):
+        v = self.store.get(key)
+        if not v:
+            return None
+        exp, data = v
+        if time.time() > exp:
+            self.store.pop(key, None)
+            return None
+        return data
+
+    async def get(self, key: str):
+        return self._get(key)
+
+    async def set(self, key: str, data: Any, ttl_sec: float):
+        self.store[key] = (time.time() + ttl_sec, data)
+
+    async def get_or_lock(self, key: str, lock_ttl: float):
+        data = self._get(key)
+        if data is not None:
+            return data, False
+        now = time.time()
+        if self.locks.get(key, 0) > now:
+            return None, False
+        self.locks[key] = now + lock_ttl
+        return None, True
+
+    async def release(self, key: str):
+        self.locks.pop(key, None)
+
+
+class SQLiteCache(CacheBackend):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._sets = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_locks (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # to_thread 워커 스레드마다 커넥션 하나
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get_sync(self, key: str):
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_sync(self, key: str, data: Any, ttl_sec: float):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(data, ensure_ascii=False, separators=(",", ":")), now + ttl_sec),
+        )
+        self._sets += 1
+        if self._sets % _PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM cache_locks WHERE expires_at <= ?", (now,))
+
+    def _get_or_lock_sync(self, key: str, lock_ttl: float):
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE: 쓰기 잠금을 먼저 잡아 "조회 → 잠금" 사이에 다른 워커가 끼지 못하게
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row:
+                conn.execute("COMMIT")
+                return json.loads(row[0]), False
+            cur = conn.execute(
+                "INSERT INTO cache_locks (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE cache_locks.expires_at <= ?",
+                (key, self.owner, now + lock_ttl, now),
+            )
+            conn.execute("COMMIT")
+            return None, cur.rowcount == 1
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release_sync(self, key: str):
+        self._conn().execute("DELETE FROM cache_locks WHERE key = ? AND owner = ?", (key, self.owner))
+
+    async def get(self, key: str):
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, data: Any, ttl_sec: float):
+        await asyncio.to_thread(self._set_sync, key, data, ttl_sec)
+
+    async def get_or_lock(self, key: str, lock_ttl: float):
+        return await asyncio.to_thread(self._get_or_lock_sync, key, lock_ttl)
+
+    async def release(self, key: str):
+        await asyncio.to_thread(self._release_sync, key)
+
+
+def make_cache() -> CacheBackend:
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteCache(CACHE_SQLITE_PATH)
+    return SimpleTTLCache()
+
+
+# 같은 프로세스 안 동시 요청은 업스트림 결과 하나를 같이 기다림
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+
+async def cached_fetch(
+    cache: CacheBackend,
+    key: str,
+    ttl_sec: float,
+    fetch: Callable[[], Awaitable[Any]],
+    poll_sec: float = 0.05,
+) -> Tuple[Any, str]:
+    """(데이터, "hit" | "miss" | "wait"). wait = 다른 요청/워커가 채운 값을 기다려서 받음."""
+    data = await cache.get(key)
+    if data is not None:
+        return data, "hit"
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        data, _ = await asyncio.shield(pending)
+        return data, "wait"
+
+    async def fill() -> Tuple[Any, str]:
+        waited = False
+        while True:
+            data, locked = await cache.get_or_lock(key, CACHE_LOCK_TTL_SEC)
+            if data is not None:
+                return data, "wait" if waited else "hit"
+            if locked:
+                break
+            # 다른 워커가 갱신 중 → 캐시에 들어오거나 잠금이 만료될 때까지 대기
+            waited = True
+            await asyncio.sleep(poll_sec)
+        try:
+            data = await fetch()
+            await cache.set(key, data, ttl_sec)
+            return data, "miss"
+        finally:
+            await cache.release(key)
+
+    task = asyncio.ensure_future(fill())
+    _inflight[key] = task
+    task.add_done_callback(_fill_done(key))
+    return await asyncio.shield(task)
+
+
+def _fill_done(key: str):
+    def done(task: "asyncio.Task[Any]") -> None:
+        _inflight.pop(key, None)
+        # 기다리던 쪽이 모두 취소돼도 "exception never retrieved" 경고 안 나게
+        if not task.cancelled():
+            task.exception()
+    return done
@@ -0,0 +1,191 @@
+"""chat_logs 정리 (서버 lifespan에서 주기 실행, CLI로도 실행 가능).
+
+    python -m backend.app.compaction
+
+- chat_logs 행은 그 시점의 전체 대화 사본이라, 같은 세션의 최신 행만 읽힌다.
+  세션별 최신 행 + Report.report_chat_id/latest_chat_id가 가리키는 행만 남기고 삭제
+- 압축 전(접두어 없는) 옛 행은 transcript.compress_raw로 재압축
+- auto_vacuum=INCREMENTAL 상태에서 PRAGMA incremental_vacuum으로 빈 페이지를 파일에서 반환
+  (기존 DB가 auto_vacuum=NONE이면 CLI로 한 번 실행해 전체 VACUUM으로 전환.
+   전체 VACUUM은 그동안 DB 쓰기를 막으므로 서버 주기 실행에서는 하지 않음)
+- 작업 전/후 파일 크기(page_count * page_size)로 회수한 바이트를 보고
+- maintenance_locks 행 잠금(BEGIN IMMEDIATE)으로 여러 워커/CLI 중 하나만 실행.
+  주기 실행은 다른 워커가 최근(주기 절반 안)에 끝냈으면 건너뜀
+"""
+import argparse
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from .config import COMPACTION_BATCH_SIZE, COMPACTION_INTERVAL_SEC, COMPACTION_LOCK_TTL_SEC
+from .db import engine, init_db
+from .transcript import ZLIB_PREFIX, compress_raw
+from . import metrics
+
+_AUTO_VACUUM_INCREMENTAL = 2
+_LOCK_NAME = "compaction"
+_OWNER = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_SUPERSEDED_IDS = text(
+    """
+    SELECT id FROM chat_logs
+    WHERE id NOT IN (SELECT MAX(id) FROM chat_logs GROUP BY session_id)
+      AND id NOT IN (SELECT report_chat_id FROM reports WHERE report_chat_id IS NOT NULL)
+      AND id NOT IN (SELECT latest_chat_id FROM reports WHERE latest_chat_id IS NOT NULL)
+    LIMIT :limit
+    """
+)
+
+_PLAIN_ROWS = text(
+    "SELECT id, message FROM chat_logs WHERE id > :after AND substr(message, 1, :n) != :prefix "
+    "ORDER BY id LIMIT :limit"
+)
+
+
+def db_size_bytes() -> int:
+    with engine.connect() as conn:
+        page_count = conn.exec_driver_sql("PRAGMA page_count").scalar() or 0
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar() or 0
+    return int(page_count) * int(page_size)
+
+
+def prune_superseded(batch_size: int = COMPACTION_BATCH_SIZE) -> int:
+    deleted = 0
+    while True:
+        with engine.begin() as conn:
+            ids = [row[0] for row in conn.execute(_SUPERSEDED_IDS, {"limit": batch_size})]
+            if not ids:
+                return deleted
+            conn.execute(text("DELETE FROM chat_logs WHERE id IN (%s)" % ",".join(str(i) for i in ids)))
+        deleted += len(ids)
+
+
+def recompress_plain(batch_size: int = COMPACTION_BATCH_SIZE) -> int:
+    recompressed = 0
+    after = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                _PLAIN_ROWS, {"after": after, "n": len(ZLIB_PREFIX), "prefix": ZLIB_PREFIX, "limit": batch_size}
+            ).fetchall()
+            if not rows:
+                return recompressed
+            for row_id, message in rows:
+                packed = compress_raw(message)
+                if packed != message:
+                    conn.execute(
+                        text("UPDATE chat_logs SET message = :m WHERE id = :id"), {"m": packed, "id": row_id}
+                    )
+                    recompressed += 1
+            # 짧아서 평문으로 남는 행은 다음 배치에서 다시 안 보도록 id로 넘어감
+            after = rows[-1][0]
+
+
+def acquire_lock(min_gap_sec: float = 0) -> bool:
+    """잠금 획득 여부. 다른 쪽이 실행 중이거나 min_gap_sec 안에 끝냈으면 False."""
+    now = time.time()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        raw = conn.connection.driver_connection
+        # BEGIN IMMEDIATE: 쓰기 잠금을 먼저 잡아 "확인 → 잠금" 사이에 다른 워커가 끼지 못하게
+        raw.execute("BEGIN IMMEDIATE")
+        try:
+            cur = raw.execute(
+                "INSERT INTO maintenance_locks (name, owner, expires_at, finished_at) VALUES (?, ?, ?, NULL) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE maintenance_locks.expires_at <= ? "
+                "AND (maintenance_locks.finished_at IS NULL OR maintenance_locks.finished_at <= ?)",
+                (_LOCK_NAME, _OWNER, now + COMPACTION_LOCK_TTL_SEC, now, now - min_gap_sec),
+            )
+            raw.execute("COMMIT")
+        except BaseException:
+            raw.execute("ROLLBACK")
+            raise
+    return cur.rowcount == 1
+
+
+def release_lock() -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE maintenance_locks SET expires_at = 0, finished_at = :now WHERE name = :name AND owner = :owner"),
+            {"now": time.time(), "name": _LOCK_NAME, "owner": _OWNER},
+        )
+
+
+def vacuum(allow_full: bool = False) -> str:
+    # VACUUM/auto_vacuum 변경은 트랜잭션 밖에서만 가능 → AUTOCOMMIT 커넥션
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        if mode != _AUTO_VACUUM_INCREMENTAL:
+            if not allow_full:
+                print("[Compaction] auto_vacuum이 INCREMENTAL이 아님 → `python -m backend.app.compaction`을 한 번 실행")
+                return "skipped"
+            conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+            return "full"
+        # 빈 페이지 하나당 한 step이라 execute()로는 한 페이지만 반환됨 → executescript로 끝까지
+        conn.connection.driver_connection.executescript("PRAGMA incremental_vacuum;")
+        return "incremental"
+
+
+def compact(batch_size: int = COMPACTION_BATCH_SIZE, allow_full_vacuum: bool = False) -> Dict[str, Any]:
+    """잠금은 호출측 책임 (run_locked / CLI)."""
+    started = time.perf_counter()
+    bytes_before = db_size_bytes()
+    deleted = prune_superseded(batch_size)
+    recompressed = recompress_plain(batch_size)
+    vacuum_mode = vacuum(allow_full_vacuum)
+    bytes_after = db_size_bytes()
+    reclaimed = max(0, bytes_before - bytes_after)
+
+    metrics.inc("compaction_runs")
+    metrics.inc("compaction_rows_deleted", deleted)
+    metrics.inc("compaction_rows_recompressed", recompressed)
+    metrics.inc("compaction_bytes_reclaimed", reclaimed)
+    result = {
+        "deleted_rows": deleted,
+        "recompressed_rows": recompressed,
+        "vacuum": vacuum_mode,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_reclaimed": reclaimed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    print(f"[Compaction] {result}")
+    return result
+
+
+def run_locked(
+    min_gap_sec: float = 0,
+    batch_size: int = COMPACTION_BATCH_SIZE,
+    allow_full_vacuum: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """잠금을 못 잡으면 None (다른 워커/CLI가 실행 중이거나 방금 끝냄)."""
+    if not acquire_lock(min_gap_sec):
+        metrics.inc("compaction_skipped")
+        return None
+    try:
+        return compact(batch_size, allow_full_vacuum)
+    finally:
+        release_lock()
+
+
+def run_scheduled() -> Optional[Dict[str, Any]]:
+    # 워커들이 같은 주기로 깨어나도 먼저 잡은 한 곳만 실행, 나머지는 이번 주기 건너뜀
+    return run_locked(min_gap_sec=COMPACTION_INTERVAL_SEC / 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="chat_logs 정리 + 재압축 + VACUUM")
+    parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE)
+    args = parser.parse_args()
+    init_db()
+    # 기존 DB의 auto_vacuum 전환(전체 VACUUM)은 CLI에서만
+    if run_locked(batch_size=args.batch_size, allow_full_vacuum=True) is None:
+        print("[Compaction] 다른 프로세스가 실행 중 → 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # 프로젝트 루트의 .env 사용 가능하게 (없어도 동작)
@@ -18,4 +19,98 @@ APP_SECRET_KEY = os.getenv("APP_SECRET_KEY", "dev-secret-change-me")
 
 # 해커톤용 간단 로그인 계정(하드코딩 대체)
 LOGIN_USERNAME = os.getenv("LOGIN_USERNAME", "admin")
-LOGIN_PASSWORD = os.getenv("LOGIN_PASSWORD", "admin")
\ No newline at end of file
+LOGIN_PASSWORD = os.getenv("LOGIN_PASSWORD", "admin")
+
+# ---- Client disconnect ----
+# 클라이언트 연결 끊김 확인 주기(초). 끊기면 진행 중인 Ollama 생성 취소
+DISCONNECT_POLL_SEC = float(os.getenv("DISCONNECT_POLL_SEC", "1.0"))
+
+# ---- Deadlines ----
+# 요청 전체 마감(라우트에서 시작). 기본은 기존 OLLAMA_TIMEOUT과 동일
+REQUEST_DEADLINE_SEC = float(os.getenv("REQUEST_DEADLINE_SEC", str(REQUEST_TIMEOUT_SEC)))
+# Finnhub 데이터 수집 단계 예산. 넘기면 모인 데이터만으로 생성 단계 진행
+DATA_STAGE_BUDGET_SEC = float(os.getenv("DATA_STAGE_BUDGET_SEC", "8"))
+# Finnhub GET 1회 상한
+FINNHUB_TIMEOUT_SEC = float(os.getenv("FINNHUB_TIMEOUT_SEC", "5"))
+# 이 시간 안에 응답 없으면 같은 GET을 한 번 더 보내고 먼저 온 쪽 사용 (0이면 끔)
+FINNHUB_HEDGE_AFTER_SEC = float(os.getenv("FINNHUB_HEDGE_AFTER_SEC", "1.5"))
+# 권한 없음/없는 종목 같은 4xx 응답을 이 시간(초) 동안 기억해 재호출 안 함 (분당 호출 예산 보호)
+FINNHUB_ERROR_TTL_SEC = int(os.getenv("FINNHUB_ERROR_TTL_SEC", "600"))
+
+# ---- Tracing ----
+# 이 시간(ms) 넘는 요청은 단계별 trace를 JSONL로 남김 (0이면 끔)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "5000"))
+SLOW_LOG_PATH = os.getenv(
+    "SLOW_LOG_PATH", str(Path(__file__).resolve().parents[2] / "logs" / "slow_requests.jsonl")
+)
+SLOW_LOG_MAX_BYTES = int(os.getenv("SLOW_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_LOG_BACKUPS = int(os.getenv("SLOW_LOG_BACKUPS", "5"))
+
+# ---- Watchlist precompute ----
+# Finnhub 무료 플랜 기준 분당 60회
+FINNHUB_RATE_PER_MIN = int(os.getenv("FINNHUB_RATE_PER_MIN", "60"))
+PRECOMPUTE_FETCH_CONCURRENCY = int(os.getenv("PRECOMPUTE_FETCH_CONCURRENCY", "4"))
+# Ollama OLLAMA_NUM_PARALLEL에 맞춰 조정
+PRECOMPUTE_LLM_CONCURRENCY = int(os.getenv("PRECOMPUTE_LLM_CONCURRENCY", "2"))
+# 이보다 오래된 종목 보고서는 재생성 대상 / 세션에서 재사용 안 함
+SYMBOL_REPORT_MAX_AGE_SEC = int(os.getenv("SYMBOL_REPORT_MAX_AGE_SEC", str(20 * 3600)))
+
+# ---- News store ----
+# 같은 종목 뉴스 증분 수집 최소 간격(초). 그 사이엔 로컬 저장소에서만 응답
+NEWS_SYNC_MIN_INTERVAL_SEC = int(os.getenv("NEWS_SYNC_MIN_INTERVAL_SEC", "300"))
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "60"))
+
+# ---- Semantic answer cache ----
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+# 같은 quote 버전 안에서도 이 시간이 지나면 새로 생성
+ANSWER_CACHE_TTL_SEC = float(os.getenv("ANSWER_CACHE_TTL_SEC", "300"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+ANSWER_CACHE_SIM_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIM_THRESHOLD", "0.92"))
+# 질문 임베딩 상한(요청 마감이 더 짧으면 그쪽)
+OLLAMA_EMBED_TIMEOUT_SEC = float(os.getenv("OLLAMA_EMBED_TIMEOUT_SEC", "10"))
+# 임베딩이 연속으로 이만큼 실패하면(임베딩 모델 미설치 등) 한동안 호출 안 함 → 유사 질문 검색만 건너뜀
+ANSWER_CACHE_EMBED_MAX_FAILURES = int(os.getenv("ANSWER_CACHE_EMBED_MAX_FAILURES", "3"))
+ANSWER_CACHE_EMBED_BACKOFF_SEC = float(os.getenv("ANSWER_CACHE_EMBED_BACKOFF_SEC", "300"))
+
+# ---- Model routing ----
+# 짧은 대화/티커 설명용 작은 모델. 두 모델을 같이 띄워두려면 Ollama 쪽 OLLAMA_MAX_LOADED_MODELS>=2
+OLLAMA_FAST_MODEL = os.getenv("OLLAMA_FAST_MODEL", OLLAMA_MODEL)
+OLLAMA_FAST_KEEP_ALIVE = os.getenv("OLLAMA_FAST_KEEP_ALIVE", "1h")
+# num_ctx가 바뀌면 Ollama가 러너를 다시 로드 → 두 라우트가 같은 모델이면 둘 중 큰 값 하나로 맞춤(routing.py)
+OLLAMA_FAST_NUM_CTX = int(os.getenv("OLLAMA_FAST_NUM_CTX", "4096"))
+# 생성 토큰 상한. -1(기본)이면 보내지 않음 = 제한 없음. qwen3는 thinking 토큰도 여기 포함
+OLLAMA_FAST_NUM_PREDICT = int(os.getenv("OLLAMA_FAST_NUM_PREDICT", "-1"))
+# 보고서/데이터 주입 답변용 (기본은 OLLAMA_MODEL)
+OLLAMA_LARGE_KEEP_ALIVE = os.getenv("OLLAMA_LARGE_KEEP_ALIVE", "1h")
+OLLAMA_LARGE_NUM_CTX = int(os.getenv("OLLAMA_LARGE_NUM_CTX", "8192"))
+OLLAMA_LARGE_NUM_PREDICT = int(os.getenv("OLLAMA_LARGE_NUM_PREDICT", "-1"))
+# 데이터 주입 없는 대화라도 프롬프트가 이보다 길면 large
+ROUTE_FAST_MAX_PROMPT_CHARS = int(os.getenv("ROUTE_FAST_MAX_PROMPT_CHARS", "2000"))
+# 이 주기(초)마다 라우팅 대상 모델들의 keep_alive를 갱신해 상주 유지 (0이면 끔)
+OLLAMA_KEEPALIVE_REFRESH_SEC = float(os.getenv("OLLAMA_KEEPALIVE_REFRESH_SEC", "600"))
+
+# ---- Startup warm-up ----
+# 0이면 warm-up 없이 바로 ready
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+# 단계별(모델 로드/Finnhub/DB) 상한. 넘겨도 ready는 됨(결과는 /ready에 표시)
+WARMUP_STEP_TIMEOUT_SEC = float(os.getenv("WARMUP_STEP_TIMEOUT_SEC", "180"))
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "4"))
+
+# ---- Shared cache ----
+# memory: 워커별 캐시 / sqlite: 같은 호스트 워커끼리 공유 (uvicorn --workers N 이면 sqlite 권장)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+CACHE_SQLITE_PATH = os.getenv(
+    "CACHE_SQLITE_PATH", str(Path(__file__).resolve().parent / "finnhub_cache.sqlite3")
+)
+# 갱신 잠금 유효시간. 잡은 워커가 죽어도 이 시간 뒤 다른 워커가 갱신
+CACHE_LOCK_TTL_SEC = float(os.getenv("CACHE_LOCK_TTL_SEC", "15"))
+
+# ---- chat_logs compaction ----
+# 이 주기(초)마다 지난 대화 행 정리 + 재압축 + incremental VACUUM (0이면 끔, CLI로만 실행)
+# 워커가 여러 개여도 잠금으로 한 주기에 한 워커만 실행
+COMPACTION_INTERVAL_SEC = int(os.getenv("COMPACTION_INTERVAL_SEC", str(6 * 3600)))
+# 한 트랜잭션에서 삭제/재압축할 행 수 (요청 처리 중인 쓰기를 오래 막지 않게)
+COMPACTION_BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", "500"))
+# 정리 작업 잠금 유효시간. 잡은 워커가 죽어도 이 시간 뒤 다른 워커/CLI가 실행
+COMPACTION_LOCK_TTL_SEC = float(os.getenv("COMPACTION_LOCK_TTL_SEC", "3600"))
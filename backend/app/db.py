@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Index, Float, func
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+PROJECT_ROOT = (Path(__file__).resolve().parents[2]).resolve()
+DB_PATH = (PROJECT_ROOT / "backend" / "app" / "chat_logs.sqlite3").resolve()
+DB_URL = f"sqlite:///{DB_PATH}"
+engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+Base = declarative_base()
+
+
+class Session(Base):
+    __tablename__ = "sessions"
+
+    id = Column(String(36), primary_key=True, index=True)
+    name = Column(String(200), nullable=False)
+    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
+    updated_at = Column(
+        DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False
+    )
+
+class Report(Base):
+    __tablename__ = "reports"
+
+    session_id = Column(String(36), ForeignKey("sessions.id"), primary_key=True)
+    symbol = Column(String(12), nullable=True)
+    report = Column(Text, nullable=True)
+    report_chat_id = Column(Integer, nullable=True)
+    latest_chat_id = Column(Integer, nullable=True)
+    updated_at = Column(
+        DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False
+    )
+
+class ChatLog(Base):
+    __tablename__ = "chat_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(36), ForeignKey("sessions.id"), nullable=False, index=True)
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
+    updated_at = Column(
+        DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False
+    )
+
+
+def init_db():
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # 새 DB 파일이면 테이블 만들기 전에 지정해야 적용됨 (기존 파일은 compaction이 한 번 VACUUM으로 전환)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        # Base.metadata.drop_all(bind=conn)
+        Base.metadata.create_all(bind=conn)
+
+
+class SymbolReport(Base):
+    # 세션과 무관한 종목별 사전 생성 보고서 (precompute CLI가 채움)
+    __tablename__ = "symbol_reports"
+
+    symbol = Column(String(12), primary_key=True, index=True)
+    report = Column(Text, nullable=False)
+    audience = Column(String(100), nullable=True)
+    focus = Column(String(100), nullable=True)
+    generated_at = Column(DateTime, nullable=False, index=True)
+
+
+class CompanyNews(Base):
+    # Finnhub company-news 원본을 종목별로 누적 (news_store가 증분 수집)
+    __tablename__ = "company_news"
+
+    symbol = Column(String(12), primary_key=True)
+    news_id = Column(Integer, primary_key=True)
+    datetime = Column(Integer, nullable=False)  # Finnhub epoch(초, UTC)
+    payload = Column(Text, nullable=False)
+
+    __table_args__ = (Index("ix_company_news_symbol_datetime", "symbol", "datetime"),)
+
+
+class NewsSyncState(Base):
+    __tablename__ = "news_sync_state"
+
+    symbol = Column(String(12), primary_key=True)
+    covered_from = Column(String(10), nullable=False)  # 수집해 둔 가장 이른 날짜(YYYY-MM-DD)
+    last_datetime = Column(Integer, nullable=True)  # 마지막으로 본 기사 시각
+    synced_at = Column(DateTime, nullable=False)
+
+
+class MaintenanceLock(Base):
+    # 워커 여러 개가 같은 DB에 정리 작업을 동시에 돌리지 않게 하는 잠금 (compaction.py)
+    __tablename__ = "maintenance_locks"
+
+    name = Column(String(50), primary_key=True)
+    owner = Column(String(50), nullable=False)
+    expires_at = Column(Float, nullable=False)  # epoch 초. 잡은 프로세스가 죽어도 이 뒤엔 풀림
+    finished_at = Column(Float, nullable=True)  # 마지막으로 끝난 시각
@@ -0,0 +1,45 @@
+import asyncio
+import time
+from typing import Awaitable, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    """라우트에서 한 번 만들고 Finnhub/Ollama 호출까지 넘겨주는 요청 단위 마감시각."""
+
+    def __init__(self, budget_sec: float) -> None:
+        self.expires_at = time.monotonic() + max(0.0, budget_sec)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def child(self, budget_sec: float) -> "Deadline":
+        # 단계별 예산: 부모 마감보다 늦어질 수 없음
+        return Deadline(min(budget_sec, self.remaining()))
+
+    def timeout(self, cap: Optional[float] = None) -> httpx.Timeout:
+        sec = self.remaining()
+        if cap is not None:
+            sec = min(sec, cap)
+        return httpx.Timeout(max(sec, 0.001))
+
+    async def run(self, aw: Awaitable[T], what: str = "") -> T:
+        """aw 전체(연결+응답)를 남은 시간 안에 끝내지 못하면 DeadlineExceeded."""
+        if self.expired():
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            raise DeadlineExceeded(f"{what} 마감 초과(시작 전)")
+        try:
+            return await asyncio.wait_for(aw, timeout=self.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"{what} 마감 초과")
@@ -1,71 +1,255 @@
 import time
-from typing import Any, Dict, Optional, Tuple
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 import httpx
 
-from .config import FINNHUB_BASE_URL, FINNHUB_API_KEY, REQUEST_TIMEOUT_SEC
+from .config import (
+    FINNHUB_BASE_URL,
+    FINNHUB_API_KEY,
+    REQUEST_TIMEOUT_SEC,
+    FINNHUB_TIMEOUT_SEC,
+    FINNHUB_HEDGE_AFTER_SEC,
+    FINNHUB_ERROR_TTL_SEC,
+)
+from .deadline import Deadline
+from . import tracing
+from . import news_store
+from .indicators import compute_digests, closes_from_candles
+from .cache import make_cache, cached_fetch
 
-class SimpleTTLCache:
-    def __init__(self):
-        self.store: Dict[str, Tuple[float, Any]] = {}
+# CACHE_BACKEND에 따라 워커 전용(memory) 또는 호스트 공유(sqlite)
+_cache = make_cache()
+
+
+class FinnhubHTTPError(RuntimeError):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def permanent(self) -> bool:
+        # 429(분당 제한)/5xx는 곧 풀릴 수 있어 기억하지 않음
+        return 400 <= self.status_code < 500 and self.status_code != 429
+
+
+async def _as_miss(aw) -> Any:
+    return await aw, "miss"
 
-    def get(self, key: str):
-        v = self.store.get(key)
-        if not v:
-            return None
-        exp, data = v
-        if time.time() > exp:
-            self.store.pop(key, None)
-            return None
-        return data
 
-    def set(self, key: str, data: Any, ttl_sec: int):
-        self.store[key] = (time.time() + ttl_sec, data)
+class RateLimiter:
+    """분당 호출 수 제한. acquire()마다 최소 간격(60/rate초)을 지켜 슬롯을 배정."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.interval = 60.0 / max(1, per_minute)
+        self.next_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
 
-_cache = SimpleTTLCache()
 
 class FinnhubClient:
-    def __init__(self) -> None:
+    def __init__(self, limiter: Optional[RateLimiter] = None) -> None:
         if not FINNHUB_API_KEY:
             raise RuntimeError("FINNHUB_API_KEY가 비어있음(.env 확인)")
         self.base = FINNHUB_BASE_URL.rstrip("/")
         self.key = FINNHUB_API_KEY
+        # 캐시 미스로 실제 나가는 GET에만 적용 (일괄 작업용)
+        self.limiter = limiter
+
+    async def _fetch(self, url: str, params: Dict[str, Any], deadline: Optional[Deadline]) -> httpx.Response:
+        if deadline is None:
+            timeout = httpx.Timeout(REQUEST_TIMEOUT_SEC)
+        else:
+            timeout = deadline.timeout(cap=FINNHUB_TIMEOUT_SEC)
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            return await client.get(url, params=params)
+
+    async def _hedged_fetch(self, url: str, params: Dict[str, Any], deadline: Optional[Deadline]) -> httpx.Response:
+        # 첫 GET이 FINNHUB_HEDGE_AFTER_SEC 안에 안 오면 한 번 더 보내고 먼저 끝난 성공 응답 사용
+        first = asyncio.ensure_future(self._fetch(url, params, deadline))
+        if FINNHUB_HEDGE_AFTER_SEC <= 0 or deadline is None:
+            return await first
+        done, _ = await asyncio.wait({first}, timeout=FINNHUB_HEDGE_AFTER_SEC)
+        if done or deadline.expired():
+            return await first
+
+        pending = {first, asyncio.ensure_future(self._fetch(url, params, deadline))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        return t.result()
+                    error = t.exception()
+            raise error
+        finally:
+            for t in pending:
+                t.cancel()
 
-    async def _get(self, path: str, params: Dict[str, Any], ttl: Optional[int] = None) -> Any:
+    async def _get(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        ttl: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        error_ttl: Optional[int] = None,
+    ) -> Any:
+        """error_ttl: 4xx 응답을 이 시간 동안 캐시해 같은 실패를 업스트림에 다시 보내지 않음."""
         url = f"{self.base}{path}"
         params = dict(params)
         params["token"] = self.key
 
-        cache_key = None
-        if ttl:
-            cache_key = f"{path}|{sorted(params.items())}"
-            hit = _cache.get(cache_key)
-            if hit is not None:
-                return hit
+        # Server-Timing 이름: fh-quote, fh-profile2, fh-company-news ...
+        stage_name = "fh-" + path.strip("/").split("/")[-1]
+        t0 = time.perf_counter()
 
-        timeout = httpx.Timeout(REQUEST_TIMEOUT_SEC)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            r = await client.get(url, params=params)
-
-        if r.status_code != 200:
-            raise RuntimeError(f"Finnhub 오류 {r.status_code}: {r.text}")
+        async def request() -> Any:
+            if deadline is None:
+                r = await self._fetch(url, params, None)
+            else:
+                r = await self._hedged_fetch(url, params, deadline)
+            if r.status_code != 200:
+                raise FinnhubHTTPError(r.status_code, f"Finnhub 오류 {r.status_code}: {r.text}")
+            tracing.add_size("finnhub_bytes", len(r.content))
+            return r.json()
 
-        data = r.json()
-        if ttl and cache_key:
-            _cache.set(cache_key, data, ttl)
+        # 캐시 키에는 토큰 제외
+        cache_key = f"{path}|{sorted(p for p in params.items() if p[0] != 'token')}"
+        error_key = f"error|{cache_key}"
+        outcome = "error"
+        try:
+            if error_ttl:
+                cached_error = await _cache.get(error_key)
+                if cached_error is not None:
+                    outcome = "neg"
+                    raise FinnhubHTTPError(cached_error["status"], cached_error["message"])
+            if ttl:
+                work = cached_fetch(_cache, cache_key, ttl, request)
+            else:
+                work = _as_miss(request())
+            try:
+                if deadline is None:
+                    data, outcome = await work
+                else:
+                    data, outcome = await deadline.run(work, f"Finnhub {path}")
+            except FinnhubHTTPError as e:
+                if error_ttl and e.permanent:
+                    await _cache.set(error_key, {"status": e.status_code, "message": str(e)}, error_ttl)
+                raise
+        finally:
+            tracing.record(stage_name, (time.perf_counter() - t0) * 1000, outcome)
         return data
 
-    async def quote(self, symbol: str) -> Any:
-        return await self._get("/quote", {"symbol": symbol}, ttl=15)
+    async def quote(self, symbol: str, deadline: Optional[Deadline] = None) -> Any:
+        return await self._get("/quote", {"symbol": symbol}, ttl=15, deadline=deadline)
 
-    async def profile2(self, symbol: str) -> Any:
-        return await self._get("/stock/profile2", {"symbol": symbol}, ttl=3600)
+    async def profile2(self, symbol: str, deadline: Optional[Deadline] = None) -> Any:
+        return await self._get("/stock/profile2", {"symbol": symbol}, ttl=3600, deadline=deadline)
 
-    async def metrics(self, symbol: str) -> Any:
-        return await self._get("/stock/metric", {"symbol": symbol, "metric": "all"}, ttl=3600)
+    async def metrics(self, symbol: str, deadline: Optional[Deadline] = None) -> Any:
+        return await self._get("/stock/metric", {"symbol": symbol, "metric": "all"}, ttl=3600, deadline=deadline)
 
-    async def news(self, symbol: str, _from: str, to: str) -> Any:
-        return await self._get("/company-news", {"symbol": symbol, "from": _from, "to": to}, ttl=300)
+    async def news(
+        self, symbol: str, _from: str, to: str, deadline: Optional[Deadline] = None, ttl: Optional[int] = 300
+    ) -> Any:
+        return await self._get(
+            "/company-news", {"symbol": symbol, "from": _from, "to": to}, ttl=ttl, deadline=deadline
+        )
     
-    async def market_news(self, category: str = "general") -> Any:
+    async def market_news(self, category: str = "general", deadline: Optional[Deadline] = None) -> Any:
         # Finnhub Market News: /news?category=general
-        return await self._get("/news", {"category": category}, ttl=60)
\ No newline at end of file
+        return await self._get("/news", {"category": category}, ttl=60, deadline=deadline)
+
+    async def daily_candles(self, symbol: str, days: int = 400, deadline: Optional[Deadline] = None) -> Any:
+        # from/to를 UTC 자정으로 맞춰 하루 동안 캐시 키가 바뀌지 않게
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        to = int((today + timedelta(days=1)).timestamp())
+        frm = int((today - timedelta(days=days)).timestamp())
+        return await self._get(
+            "/stock/candle",
+            {"symbol": symbol, "resolution": "D", "from": frm, "to": to},
+            ttl=3600,
+            deadline=deadline,
+            # 플랜/종목에 일봉 권한이 없으면 403이 계속 옴 → 매 요청 재호출하지 않게
+            error_ttl=FINNHUB_ERROR_TTL_SEC,
+        )
+
+
+async def technical_digests(
+    finn: FinnhubClient, symbols: List[str], deadline: Optional[Deadline] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """여러 종목 일봉을 받아 지표를 한 번에(행렬로) 계산. 실패한 종목은 None."""
+    results = await asyncio.gather(
+        *[finn.daily_candles(s, deadline=deadline) for s in symbols], return_exceptions=True
+    )
+    closes = {}
+    for sym, res in zip(symbols, results):
+        if isinstance(res, BaseException):
+            print(f"[Finnhub] candles failed for {sym}: {res}")
+            continue
+        c = closes_from_candles(res)
+        if c:
+            closes[sym] = c
+    with tracing.stage("indicators"):
+        digests = compute_digests(closes)
+    return {sym: digests.get(sym) for sym in symbols}
+
+
+async def _single_digest(finn: FinnhubClient, symbol: str, deadline: Optional[Deadline]) -> Optional[Dict[str, Any]]:
+    candles = await finn.daily_candles(symbol, deadline=deadline)
+    closes = closes_from_candles(candles)
+    if not closes:
+        raise RuntimeError(f"일봉 데이터 없음({(candles or {}).get('s') if isinstance(candles, dict) else candles})")
+    with tracing.stage("indicators"):
+        return compute_digests({symbol: closes})[symbol]
+
+
+async def fetch_bundle(
+    finn: FinnhubClient,
+    symbol: str,
+    news_days: int,
+    news_limit: int,
+    deadline: Optional[Deadline] = None,
+    with_technical: bool = True,
+) -> Dict[str, Any]:
+    """quote/profile2/metrics/news(+일봉 기술지표 요약)를 병렬로 모은다.
+
+    마감/오류로 실패한 항목은 None으로 두고 이름을 "missing"에 기록 → 호출측이 부분 데이터로 진행.
+    with_technical=False면 "technical"은 호출측이 채움(일괄 계산용).
+    """
+    today = date.today()
+    frm = (today - timedelta(days=news_days)).isoformat()
+    names = ["quote", "profile", "metrics", "news"]
+    calls = [
+        finn.quote(symbol, deadline=deadline),
+        finn.profile2(symbol, deadline=deadline),
+        finn.metrics(symbol, deadline=deadline),
+        # 뉴스 너무 길면 느려짐 → 저장소에서 최신 news_limit개만
+        news_store.company_news(finn, symbol, frm, today.isoformat(), deadline=deadline, limit=news_limit),
+    ]
+    if with_technical:
+        names.append("technical")
+        calls.append(_single_digest(finn, symbol, deadline))
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    bundle: Dict[str, Any] = {"symbol": symbol, "missing": [], "errors": {}}
+    for name, res in zip(names, results):
+        if isinstance(res, BaseException):
+            bundle[name] = None
+            bundle["missing"].append(name)
+            bundle["errors"][name] = str(res) or type(res).__name__
+        else:
+            bundle[name] = res
+
+    bundle.setdefault("technical", None)
+    return bundle
\ No newline at end of file
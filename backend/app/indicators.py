@@ -0,0 +1,112 @@
+"""일봉 종가 → 고정 크기 기술지표 요약.
+
+가격 이력 전체를 프롬프트에 넣지 않고, 여러 종목을 (종목 x 날짜) 행렬 하나로 묶어
+NumPy로 한 번에 계산한 뒤 종목당 한 줄 요약만 넣는다.
+행렬은 최근 날짜를 오른쪽 끝에 맞추고 이력이 짧은 종목은 왼쪽을 NaN으로 채운다.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+RETURN_HORIZONS = (5, 20, 60, 120, 250)  # 거래일 기준 1주/1개월/3개월/6개월/1년
+MA_WINDOWS = (20, 50, 200)
+RSI_PERIOD = 14
+TRADING_DAYS = 252
+
+
+def _closes_matrix(closes_by_symbol: Dict[str, Sequence[float]]) -> np.ndarray:
+    n = max((len(c) for c in closes_by_symbol.values()), default=0)
+    mat = np.full((len(closes_by_symbol), n), np.nan)
+    for i, closes in enumerate(closes_by_symbol.values()):
+        if len(closes):
+            mat[i, n - len(closes):] = np.asarray(closes, dtype=float)
+    return mat
+
+
+def _rsi(mat: np.ndarray, period: int) -> np.ndarray:
+    # Wilder 평활: 시간축만 루프, 종목축은 벡터
+    diff = np.diff(mat, axis=1)
+    gain = np.where(diff > 0, diff, 0.0)
+    loss = np.where(diff < 0, -diff, 0.0)
+    n_sym, n = diff.shape
+    avg_gain = np.full(n_sym, np.nan)
+    avg_loss = np.full(n_sym, np.nan)
+    seen = np.zeros(n_sym, dtype=int)
+    for t in range(n):
+        valid = ~np.isnan(diff[:, t])
+        seen = np.where(valid, seen + 1, seen)
+        seed = valid & (seen == period)
+        if seed.any():
+            lo = t - period + 1
+            avg_gain[seed] = gain[seed, lo:t + 1].mean(axis=1)
+            avg_loss[seed] = loss[seed, lo:t + 1].mean(axis=1)
+        roll = valid & (seen > period)
+        if roll.any():
+            avg_gain[roll] = (avg_gain[roll] * (period - 1) + gain[roll, t]) / period
+            avg_loss[roll] = (avg_loss[roll] * (period - 1) + loss[roll, t]) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        rsi = 100.0 - 100.0 / (1.0 + rs)
+    return np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, rsi)
+
+
+def compute_digests(closes_by_symbol: Dict[str, Sequence[float]]) -> Dict[str, Dict[str, Optional[float]]]:
+    """종목별 {"ret_5d": %, ..., "ma20_gap": %, "vol_20d": %, "mdd_1y": %, "rsi14": ...}. 데이터 부족하면 None."""
+    if not closes_by_symbol:
+        return {}
+    mat = _closes_matrix(closes_by_symbol)
+    n = mat.shape[1]
+    last = mat[:, -1] if n else np.full(mat.shape[0], np.nan)
+    cols: Dict[str, np.ndarray] = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for h in RETURN_HORIZONS:
+            base = mat[:, -1 - h] if n > h else np.full(mat.shape[0], np.nan)
+            cols[f"ret_{h}d"] = (last / base - 1.0) * 100
+
+        for w in MA_WINDOWS:
+            window = mat[:, -w:] if n >= w else np.full((mat.shape[0], 1), np.nan)
+            # 창 안에 NaN(이력 부족)이 있으면 평균도 NaN
+            ma = window.mean(axis=1)
+            cols[f"ma{w}_gap"] = (last / ma - 1.0) * 100
+
+        log_ret = np.diff(np.log(mat), axis=1)
+        for w in (20, 60):
+            window = log_ret[:, -w:] if log_ret.shape[1] >= w else np.full((mat.shape[0], 1), np.nan)
+            cols[f"vol_{w}d"] = window.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+
+        year = mat[:, -TRADING_DAYS:]
+        peak = np.fmax.accumulate(year, axis=1)
+        # fmin은 NaN을 건너뜀 (nanmin과 달리 전부 NaN이어도 경고 없음)
+        cols["mdd_1y"] = np.fmin.reduce(year / peak - 1.0, axis=1) * 100 if year.size else np.full(mat.shape[0], np.nan)
+
+    cols["rsi14"] = _rsi(mat, RSI_PERIOD) if n > RSI_PERIOD else np.full(mat.shape[0], np.nan)
+
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    for i, symbol in enumerate(closes_by_symbol):
+        out[symbol] = {
+            k: (None if np.isnan(v[i]) else round(float(v[i]), 1)) for k, v in cols.items()
+        }
+        out[symbol]["last"] = None if np.isnan(last[i]) else round(float(last[i]), 2)
+    return out
+
+
+def closes_from_candles(candles: Any) -> Sequence[float]:
+    """Finnhub /stock/candle 응답 → 종가 리스트 (s != ok면 빈 리스트)."""
+    if not isinstance(candles, dict) or candles.get("s") != "ok":
+        return []
+    return candles.get("c") or []
+
+
+def format_digest(digest: Optional[Dict[str, Optional[float]]]) -> str:
+    """프롬프트용 한 줄. 키 순서 고정."""
+    if not digest:
+        return "(데이터 없음)"
+    parts = []
+    for k, v in digest.items():
+        if v is None:
+            continue
+        parts.append(f"{k}={v:+.1f}" if k.startswith(("ret_", "ma", "mdd")) else f"{k}={v}")
+    if not parts:
+        return "(데이터 없음)"
+    return " ".join(parts) + " (ret/ma_gap/vol/mdd 단위 %)"
@@ -1,16 +1,17 @@
 import re
-import json
+import time
 import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
 from datetime import date, timedelta
 
-from fastapi import FastAPI, HTTPException, Request, Depends
+from fastapi import FastAPI, HTTPException, Request, Response, Depends
 from fastapi.responses import FileResponse, RedirectResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, func
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import func
 
 from .schemas import (
     ChatRequest,
@@ -20,72 +21,111 @@ from .schemas import (
     StockReportRequest,
     StockReportResponse,
     SessionListResponse,
+    SymbolReportResponse,
     SessionMessagesResponse,
     ReportViewResponse,
 )
 from .ollama_client import OllamaClient
-from .config import OLLAMA_BASE_URL, OLLAMA_MODEL, APP_SECRET_KEY, LOGIN_USERNAME, LOGIN_PASSWORD
-from .finnhub_client import FinnhubClient
-from .report_agent import run_stock_report
+from .config import (
+    OLLAMA_BASE_URL,
+    OLLAMA_MODEL,
+    APP_SECRET_KEY,
+    LOGIN_USERNAME,
+    LOGIN_PASSWORD,
+    DISCONNECT_POLL_SEC,
+    REQUEST_DEADLINE_SEC,
+    DATA_STAGE_BUDGET_SEC,
+    ANSWER_CACHE_ENABLED,
+    OLLAMA_KEEPALIVE_REFRESH_SEC,
+    WARMUP_ENABLED,
+    COMPACTION_INTERVAL_SEC,
+)
+from .finnhub_client import FinnhubClient, fetch_bundle
+from .deadline import Deadline, DeadlineExceeded
+from .report_agent import report_audience_focus, run_stock_report
+from .db import SessionLocal, Session, Report, ChatLog, init_db
+from .precompute import load_symbol_report
+from . import metrics
+from . import tracing
+from . import news_store
+from .answer_cache import EmbedBackoff, SemanticAnswerCache, data_version
+from .prompts import bundle_sections, render
+from .routing import build_payload, load_options, resident_models
+from .warmup import warm_up
+from .transcript import encode_message, decode_message
+from .compaction import run_scheduled as run_scheduled_compaction
+
+# 시장 개요 카드 = 지수 대신 ETF 프록시 (warm-up 때 캐시도 미리 채움)
+MARKET_OVERVIEW_SYMBOLS = [
+    "IVV",  # S&P500 proxy
+    "QQQ",  # Nasdaq100 proxy
+    "DIA",  # Dow proxy
+    "IWM",  # Russell2000 proxy
+    "TLT",  # 20Y bond proxy
+]
+
+# 클라이언트는 import 시점이 아니라 처음 쓸 때(보통 warm-up) 만든다
+_client: Optional[OllamaClient] = None
+_finn: Optional[FinnhubClient] = None
+
+
+def get_client() -> OllamaClient:
+    global _client
+    if _client is None:
+        _client = OllamaClient()
+    return _client
+
+
+def get_finn() -> FinnhubClient:
+    global _finn
+    if _finn is None:
+        _finn = FinnhubClient()
+    return _finn
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    app.state.ready = not WARMUP_ENABLED
+    app.state.warmup = {}
 
-app = FastAPI(title="Ollama Qwen3 Prototype")
+    async def run_warmup():
+        try:
+            app.state.warmup = await warm_up(get_client(), get_finn(), MARKET_OVERVIEW_SYMBOLS)
+        except Exception as e:
+            app.state.warmup = {"error": str(e)}
+        app.state.ready = True
+
+    tasks = []
+    if WARMUP_ENABLED:
+        # 서버는 바로 뜨고(/health 응답), 로드밸런서는 /ready가 200일 때만 트래픽 전달
+        tasks.append(asyncio.create_task(run_warmup()))
+    if OLLAMA_KEEPALIVE_REFRESH_SEC > 0:
+        tasks.append(asyncio.create_task(refresh_resident_models()))
+    if COMPACTION_INTERVAL_SEC > 0:
+        tasks.append(asyncio.create_task(run_compaction()))
+    yield
+    for task in tasks:
+        task.cancel()
+
+
+app = FastAPI(title="Ollama Qwen3 Prototype", lifespan=lifespan)
 app.add_middleware(
     SessionMiddleware,
     secret_key=APP_SECRET_KEY,
     same_site="lax",
     https_only=False,  # 로컬개발은 False, https 배포면 True 권장
 )
-client = OllamaClient()
-finn = FinnhubClient()
+# 세션 메시지/보고서 JSON이 커서 압축 (작은 응답은 그대로)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+# 마지막에 추가 = 가장 바깥 → 세션 처리까지 포함한 전체 시간 측정
+app.add_middleware(tracing.ServerTimingMiddleware)
+answer_cache = SemanticAnswerCache()
+embed_backoff = EmbedBackoff()
 
 # --- 프론트 정적 파일 경로 (프로젝트 루트/frontend) ---
 PROJECT_ROOT = (Path(__file__).resolve().parents[2]).resolve()
 FRONTEND_DIR = (PROJECT_ROOT / "frontend").resolve()
-DB_PATH = (PROJECT_ROOT / "backend" / "app" / "chat_logs.sqlite3").resolve()
-DB_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
-Base = declarative_base()
-
-
-class Session(Base):
-    __tablename__ = "sessions"
-
-    id = Column(String(36), primary_key=True, index=True)
-    name = Column(String(200), nullable=False)
-    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
-    updated_at = Column(
-        DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False
-    )
-
-class Report(Base):
-    __tablename__ = "reports"
-
-    session_id = Column(String(36), ForeignKey("sessions.id"), primary_key=True)
-    symbol = Column(String(12), nullable=True)
-    report = Column(Text, nullable=True)
-    report_chat_id = Column(Integer, nullable=True)
-    latest_chat_id = Column(Integer, nullable=True)
-    updated_at = Column(
-        DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False
-    )
-
-class ChatLog(Base):
-    __tablename__ = "chat_logs"
-
-    id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(36), ForeignKey("sessions.id"), nullable=False, index=True)
-    message = Column(Text, nullable=False)
-    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
-    updated_at = Column(
-        DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False
-    )
-
-
-def init_db():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    # Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
 
 
 def summarize_messages(messages):
@@ -141,10 +181,7 @@ def load_latest_session_context(session_id: str) -> str:
         )
         if not row:
             raise HTTPException(status_code=404, detail="session_id에 해당하는 채팅 내역이 없습니다.")
-        try:
-            payload = json.loads(row.message)
-        except Exception:
-            payload = {}
+        payload = decode_message(row.message)
         messages = payload.get("messages") or []
         response = payload.get("response")
         lines = []
@@ -176,15 +213,106 @@ def get_latest_chat_log_id(session_id: str):
         db.close()
 
 
+# -------------------------
+# 클라이언트 연결 끊김 → 업스트림 생성 취소
+# -------------------------
+# detach된 작업이 GC로 사라지지 않게 참조 유지
+_background_tasks = set()
+
+
+def _log_background_result(task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        print(f"[Background] task failed: {task.exception()}")
+
+
+async def run_until_disconnect(request: Request, coro, name: str, detach: bool = False):
+    """coro를 돌리면서 클라이언트 연결을 주기적으로 확인한다.
+
+    끊기면 기본은 task를 취소(httpx 연결이 닫혀 Ollama 생성도 중단)하고,
+    detach=True면 백그라운드에서 끝까지 돌게 둔다(보고서처럼 결과를 저장하는 작업용).
+    """
+    task = asyncio.ensure_future(coro)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SEC)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            break
+
+    if detach:
+        metrics.inc(f"{name}_detached")
+        _background_tasks.add(task)
+        task.add_done_callback(_log_background_result)
+    else:
+        task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass
+        metrics.inc(f"{name}_cancelled")
+    # 이미 끊긴 클라이언트라 실제로 전달되진 않음 (nginx 관례 499)
+    raise HTTPException(status_code=499, detail="client disconnected")
+
+
+# -------------------------
+# 비슷한 질문 답변 재사용
+# -------------------------
+async def lookup_answer_cache(
+    endpoint: str, symbol: str, bundle, question: str, deadline: Optional[Deadline] = None
+):
+    """(group, embedding, answer). group이 None이면 캐시 대상 아님, answer가 있으면 생성 생략."""
+    version = data_version(bundle)
+    if not ANSWER_CACHE_ENABLED or not version or not question.strip():
+        return None, None, None
+    group = (endpoint, symbol, version)
+    t0 = time.perf_counter()
+    embedding = None
+    answer = answer_cache.lookup_exact(group, question)
+    if answer is None and embed_backoff.allow():
+        try:
+            embedding = await get_client().embed(question, deadline=deadline)
+            embed_backoff.success()
+        except Exception as e:
+            metrics.inc("answer_cache_embed_error")
+            if embed_backoff.failure():
+                print(f"[AnswerCache] embed failed, skipping for {embed_backoff.backoff_sec:.0f}s: {e}")
+        if embedding:
+            hit = answer_cache.lookup(group, embedding)
+            if hit:
+                answer = hit[0]
+    outcome = "hit" if answer is not None else "miss"
+    tracing.record("answer-cache", (time.perf_counter() - t0) * 1000, outcome)
+    metrics.inc(f"answer_cache_{outcome}")
+    return group, embedding, answer
+
+
 if not FRONTEND_DIR.exists():
     print(f"[WARN] frontend directory not found: {FRONTEND_DIR}")
 
 app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR), html=False), name="static")
 
 
-@app.on_event("startup")
-def on_startup():
-    init_db()
+async def refresh_resident_models():
+    # 잘 안 쓰는 쪽(fast/large) 모델도 keep_alive 만료로 내려가지 않게 주기적으로 갱신
+    while True:
+        await asyncio.sleep(OLLAMA_KEEPALIVE_REFRESH_SEC)
+        for model, keep_alive in resident_models().items():
+            try:
+                await get_client().keep_alive(model, keep_alive, load_options(model))
+            except Exception as e:
+                print(f"[Ollama] keep_alive refresh failed for {model}: {e}")
+
+
+async def run_compaction():
+    # sqlite 작업은 블로킹이라 스레드에서 (요청 처리 루프를 막지 않게)
+    # 워커 여러 개면 잠금으로 한 곳만 실행, 기존 DB의 전체 VACUUM 전환은 CLI에서만
+    while True:
+        await asyncio.sleep(COMPACTION_INTERVAL_SEC)
+        try:
+            await asyncio.to_thread(run_scheduled_compaction)
+        except Exception as e:
+            print(f"[Compaction] failed: {e}")
 
 
 @app.get("/")
@@ -194,7 +322,16 @@ def root():
 
 @app.get("/health")
 async def health():
-    return {"ok": True, "model": OLLAMA_MODEL, "ollama": OLLAMA_BASE_URL}
+    return {"ok": True, "model": OLLAMA_MODEL, "models": resident_models(), "ollama": OLLAMA_BASE_URL}
+
+@app.get("/ready")
+async def ready(request: Request):
+    body = {"ready": request.app.state.ready, "warmup": request.app.state.warmup}
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@app.get("/api/metrics")
+async def get_metrics():
+    return metrics.snapshot()
 
 def require_login(request: Request):
     if not request.session.get("user"):
@@ -237,10 +374,36 @@ def serve_chat():
 # -------------------------
 # 세션 목록/메시지 조회
 # -------------------------
+# ETag는 id/시각 컬럼만으로 계산 → 클라이언트 버전과 같으면 본문(JSON blob)을 읽지 않고 304
+def etag_matches(request: Request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    return inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # 브라우저가 캐시하되 매번 재검증
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
+
+
 @app.get("/api/ssessions", response_model=SessionListResponse)
-def list_sessions():
+def list_sessions(request: Request, response: Response):
     db = SessionLocal()
     try:
+        latest, count = db.query(func.max(Session.updated_at), func.count(Session.id)).one()
+        etag = f'"s-{count}-{latest.isoformat() if latest else 0}"'
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
         rows = db.query(Session).order_by(Session.updated_at.desc(), Session.created_at.desc()).all()
         sessions = [
             {"id": row.id, "name": row.name, "updated_at": row.updated_at}
@@ -254,37 +417,50 @@ def list_sessions():
 
 
 @app.get("/api/sessions/{session_id}/messages", response_model=SessionMessagesResponse)
-def get_session_messages(session_id: str):
+def get_session_messages(session_id: str, request: Request, response: Response):
     db = SessionLocal()
     try:
-        row = (
-            db.query(ChatLog)
+        latest = (
+            db.query(ChatLog.id)
             .filter(ChatLog.session_id == session_id)
             .order_by(ChatLog.created_at.desc(), ChatLog.id.desc())
             .first()
         )
-        if not row:
+        if not latest:
             raise HTTPException(status_code=404, detail="session_id에 해당하는 채팅 내역이 없습니다.")
-        try:
-            payload = json.loads(row.message)
-        except Exception:
-            payload = {}
+        etag = f'"m-{latest.id}"'
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        row = db.get(ChatLog, latest.id)
+        payload = decode_message(row.message)
         messages = payload.get("messages") or []
-        response = payload.get("response")
-        if response:
-            messages = messages + [{"role": "assistant", "content": response}]
+        answer = payload.get("response")
+        if answer:
+            messages = messages + [{"role": "assistant", "content": answer}]
         return {"session_id": session_id, "messages": messages}
     finally:
         db.close()
 
 
 @app.get("/api/sessions/{session_id}/report", response_model=ReportViewResponse)
-def get_session_report(session_id: str):
+def get_session_report(session_id: str, request: Request, response: Response):
     db = SessionLocal()
     try:
-        report_row = db.query(Report).filter(Report.session_id == session_id).first()
-        if not report_row:
+        version = (
+            db.query(Report.report_chat_id, Report.latest_chat_id, Report.updated_at)
+            .filter(Report.session_id == session_id)
+            .first()
+        )
+        if not version:
             raise HTTPException(status_code=404, detail="session_id에 해당하는 보고서가 없습니다.")
+        etag = f'"r-{version.report_chat_id}-{version.latest_chat_id}-{version.updated_at.isoformat()}"'
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        report_row = db.query(Report).filter(Report.session_id == session_id).first()
         return {
             "session_id": session_id,
             "report": report_row.report,
@@ -321,7 +497,7 @@ def extract_tickers(text: str, max_n: int = 1) -> list[str]:
 # 채팅: 티커 감지 시 Finnhub 자동 주입
 # -------------------------
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
+async def chat(req: ChatRequest, request: Request):
     # messages normalize (dict/pydantic 둘 다)
     messages_in = []
     for m in req.messages:
@@ -337,71 +513,40 @@ async def chat(req: ChatRequest):
             last_user = (m.get("content") or "")
             break
 
-    symbols = extract_tickers(last_user, max_n=1)
+    with tracing.stage("ticker"):
+        symbols = extract_tickers(last_user, max_n=1)
+    deadline = Deadline(REQUEST_DEADLINE_SEC)
     
     finnhub_bundle = None
 
     if symbols:
         symbol = symbols[0]
-        try:
-            today = date.today()
-            frm = (today - timedelta(days=10)).isoformat()
-            to = today.isoformat()
-
-            # 병렬 호출
-            quote, profile, metrics, news = await asyncio.gather(
-                finn.quote(symbol),
-                finn.profile2(symbol),
-                finn.metrics(symbol),
-                finn.news(symbol, frm, to),
-            )
-
-            # 뉴스 너무 길면 느려짐 → 5개로 제한
-            if isinstance(news, list):
-                news = news[:5]
-
-            # profile이 유효할 때만 주입
-            if isinstance(profile, dict) and profile.get("ticker"):
-                finnhub_bundle = {
-                    "symbol": symbol,
-                    "quote": quote,
-                    "profile": profile,
-                    "metrics": metrics,
-                    "news": news,
-                }
-
-        except Exception as e:
+        # 데이터 단계 예산 안에서 병렬 호출, 늦은 항목은 버리고 진행
+        bundle = await fetch_bundle(get_finn(), symbol, news_days=10, news_limit=5,
+                                    deadline=deadline.child(DATA_STAGE_BUDGET_SEC))
+        if bundle["errors"]:
             # 실패 원인을 숨기지 말고 출력
-            print(f"[Finnhub] fetch failed for {symbol}: {e}")
-            finnhub_bundle = None
+            print(f"[Finnhub] partial fetch for {symbol}: {bundle['errors']}")
 
+        # profile(또는 quote)이 유효할 때만 주입
+        profile = bundle["profile"]
+        quote = bundle["quote"]
+        if (isinstance(profile, dict) and profile.get("ticker")) or (isinstance(quote, dict) and quote.get("c")):
+            finnhub_bundle = bundle
+
+    t_prompt = time.perf_counter()
     messages = messages_in
 
     if finnhub_bundle:
-        injected = f"""
-사용자가 종목/ETF 티커를 언급했다: {finnhub_bundle["symbol"]}
-아래 Finnhub 데이터만 근거로 답하라. 모르면 모른다고 말하라.
-과장 금지. 추정은 '추정'으로 표시.
-
-[Finnhub quote]
-{finnhub_bundle["quote"]}
-
-[Finnhub profile2]
-{finnhub_bundle["profile"]}
-
-[Finnhub metrics]
-{finnhub_bundle["metrics"]}
-
-[Finnhub news(최근10일, 최대5개)]
-{finnhub_bundle["news"]}
-
-[출력 형식]
-1) 한줄 결론(장기/적립식 관점)
-2) 펀더멘털 강점 3 (근거 포함)
-3) 리스크 3 (근거 포함)
-4) 액션 3 (분할매수 조건 포함)
-5) 확인 질문 2
-""".strip()
+        missing_note = ""
+        if finnhub_bundle["missing"]:
+            missing_note = f"\n다음 항목은 수집하지 못했다(근거로 쓰지 말 것): {', '.join(finnhub_bundle['missing'])}"
+        injected = render(
+            "chat_finnhub",
+            symbol=finnhub_bundle["symbol"],
+            missing_note=missing_note,
+            **bundle_sections(finnhub_bundle),
+        )
 
         messages = [
             {"role": "system", "content": "한국어로, 근거 중심으로 답하라."},
@@ -417,30 +562,45 @@ async def chat(req: ChatRequest):
             {"role": "system", "content": f'사용자가 "{symbol}"를 물었다. 이것이 주식/ETF 티커라는 전제로, 무엇인지(ETF/주식), 추종지수/섹터/용도(장기 적립식 관점)를 간단히 설명하라. 정확한 확인을 위해 거래소/국가를 1줄로 질문하라.'},
             *messages
         ]
+    tracing.record("prompt", (time.perf_counter() - t_prompt) * 1000)
+    tracing.add_size("prompt_chars", sum(len(m.get("content") or "") for m in messages))
 
-    payload = {
-        "model": OLLAMA_MODEL,
-        "messages": messages,
-        "stream": False,
-        "keep_alive": "1h",
-    }
+    payload = build_payload("chat", messages, has_data=bool(finnhub_bundle))
 
-    try:
-        data = await client.chat(payload)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Ollama 호출 실패: {e}")
+    # 대화 이력 없는 첫 질문만 재사용 (이어지는 대화는 문맥이 달라짐)
+    cache_group = cache_embedding = cached = None
+    single_turn = sum(1 for m in messages_in if m.get("role") in ("user", "assistant")) == 1
+    if finnhub_bundle and single_turn:
+        cache_group, cache_embedding, cached = await lookup_answer_cache(
+            "chat", finnhub_bundle["symbol"], finnhub_bundle, last_user, deadline=deadline
+        )
+
+    if cached is not None:
+        content = cached
+    else:
+        try:
+            data = await run_until_disconnect(request, get_client().chat(payload, deadline=deadline), "chat")
+        except HTTPException:
+            raise
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=f"Ollama 응답 시간 초과: {e}")
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Ollama 호출 실패: {e}")
 
-    msg = data.get("message") or {}
-    content = msg.get("content", "")
+        msg = data.get("message") or {}
+        content = msg.get("content", "")
+        if cache_group and content:
+            answer_cache.put(cache_group, last_user, cache_embedding, content)
+    t_db = time.perf_counter()
     try:
         payload = {
             "messages": messages_in,
             "response": content,
-            "model": OLLAMA_MODEL,
+            "model": payload["model"],
             "last_user": last_user,
         }
         session_name = summarize_messages(messages_in)
-        chat_log_id = save_chat_log(json.dumps(payload, ensure_ascii=True), req.session_id, session_name)
+        chat_log_id = save_chat_log(encode_message(payload), req.session_id, session_name)
         if chat_log_id:
             db = SessionLocal()
             try:
@@ -460,7 +620,8 @@ async def chat(req: ChatRequest):
                 db.close()
     except Exception as e:
         print(f"[DB] save failed: {e}")
-    return ChatResponse(model=OLLAMA_MODEL, content=content)
+    tracing.record("db", (time.perf_counter() - t_db) * 1000)
+    return ChatResponse(model=payload["model"], content=content)
 
 
 # -------------------------
@@ -469,7 +630,7 @@ async def chat(req: ChatRequest):
 @app.get("/api/tools/quote")
 async def tool_quote(symbol: str):
     try:
-        return await finn.quote(symbol)
+        return await get_finn().quote(symbol)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -477,7 +638,7 @@ async def tool_quote(symbol: str):
 @app.get("/api/tools/profile")
 async def tool_profile(symbol: str):
     try:
-        return await finn.profile2(symbol)
+        return await get_finn().profile2(symbol)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -485,7 +646,7 @@ async def tool_profile(symbol: str):
 @app.get("/api/tools/metrics")
 async def tool_metrics(symbol: str):
     try:
-        return await finn.metrics(symbol)
+        return await get_finn().metrics(symbol)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -495,8 +656,7 @@ async def tool_news(symbol: str, days: int = 7):
     try:
         today = date.today()
         frm = (today - timedelta(days=days)).isoformat()
-        news = await finn.news(symbol, frm, today.isoformat())
-        return news[:5] if isinstance(news, list) else news
+        return await news_store.company_news(get_finn(), symbol, frm, today.isoformat(), limit=5)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -505,81 +665,87 @@ async def tool_news(symbol: str, days: int = 7):
 # “이 종목 사도 돼?” 에이전트(직접 호출용)
 # -------------------------
 @app.post("/api/agent/should-i-buy", response_model=ShouldIBuyResponse)
-async def should_i_buy(req: ShouldIBuyRequest):
+async def should_i_buy(req: ShouldIBuyRequest, request: Request):
     symbol = req.symbol.strip().upper()
     question = (req.question or "이 종목 사도 돼?").strip()
+    deadline = Deadline(REQUEST_DEADLINE_SEC)
 
-    try:
-        quote = await finn.quote(symbol)
-        profile = await finn.profile2(symbol)
-        metrics = await finn.metrics(symbol)
-
-        today = date.today()
-        frm = (today - timedelta(days=10)).isoformat()
-        news = await finn.news(symbol, frm, today.isoformat())
-        if isinstance(news, list):
-            news = news[:5]
-
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Finnhub 호출 실패: {e}")
-
-    prompt = f"""
-너는 투자 리서치 어시스턴트다.
-사용자 질문: "{question}"
-대상 종목: {symbol}
-
-아래 데이터만 근거로 답하라. 모르면 모른다고 말해라.
-과장 금지. 추정은 '추정'으로 표시.
-투자 조언이 아니라 정보 제공이며, 마지막에 리스크 고지 1줄.
-
-[quote]
-{quote}
-
-[profile2]
-{profile}
-
-[metrics]
-{metrics}
-
-[news(최근10일, 최대5개)]
-{news}
-
-### 요구사항 
-- 한국어로 답하라.
-[출력 형식]
-1) 결론(한 줄): 장기/적립식 관점
-2) 펀더멘털 강점 3가지 (근거 지표/사실 포함)
-3) 핵심 리스크 3가지 (근거 포함)
-4) 체크리스트: 지금 확인해야 할 것 5개
-5) 한 문장 리스크 고지
+    bundle = await fetch_bundle(get_finn(), symbol, news_days=10, news_limit=5,
+                                deadline=deadline.child(DATA_STAGE_BUDGET_SEC))
+    if bundle["quote"] is None and bundle["profile"] is None:
+        raise HTTPException(status_code=502, detail=f"Finnhub 호출 실패: {bundle['errors']}")
 
+    cache_group, cache_embedding, cached = await lookup_answer_cache(
+        "should_i_buy", symbol, bundle, question, deadline=deadline
+    )
+    if cached is not None:
+        return ShouldIBuyResponse(symbol=symbol, answer=cached)
 
-""".strip()
+    t_prompt = time.perf_counter()
+    prompt = render("should_i_buy", question=question, symbol=symbol, **bundle_sections(bundle))
+    tracing.record("prompt", (time.perf_counter() - t_prompt) * 1000)
+    tracing.add_size("prompt_chars", len(prompt))
 
-    payload = {
-        "model": OLLAMA_MODEL,
-        "messages": [
+    payload = build_payload(
+        "should_i_buy",
+        [
             {"role": "system", "content": "한국어로, 근거 중심으로 답하라."},
             {"role": "user", "content": prompt},
         ],
-        "stream": False,
-        "keep_alive": "1h",
-    }
+        has_data=True,
+    )
 
     try:
-        data = await client.chat(payload)
+        data = await run_until_disconnect(request, get_client().chat(payload, deadline=deadline), "should_i_buy")
         content = (data.get("message") or {}).get("content", "")
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Ollama 응답 시간 초과: {e}")
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Ollama 호출 실패: {e}")
 
+    if cache_group and content:
+        answer_cache.put(cache_group, question, cache_embedding, content)
     return ShouldIBuyResponse(symbol=symbol, answer=content)
 
 
 # -------------------------
 # 주식 분석 보고서 에이전트
 # -------------------------
+def save_session_report(session_id: str, symbol: str, report: str, chat_id):
+    db = SessionLocal()
+    try:
+        report_row = db.query(Report).filter(Report.session_id == session_id).first()
+        if report_row:
+            report_row.report = report
+            report_row.symbol = symbol
+            report_row.report_chat_id = chat_id
+            report_row.latest_chat_id = chat_id
+        else:
+            report_row = Report(
+                session_id=session_id,
+                symbol=symbol,
+                report=report,
+                report_chat_id=chat_id,
+                latest_chat_id=chat_id,
+            )
+            db.add(report_row)
+        db.commit()
+    finally:
+        db.close()
+
+
+@app.get("/api/reports/{symbol}", response_model=SymbolReportResponse)
+def get_symbol_report(symbol: str):
+    row = load_symbol_report(symbol.strip().upper())
+    if not row:
+        raise HTTPException(status_code=404, detail="해당 종목의 최근 보고서가 없습니다.")
+    return {"symbol": row.symbol, "report": row.report, "generated_at": row.generated_at}
+
+
 @app.post("/api/agent/stock-report", response_model=StockReportResponse)
-async def stock_report(req: StockReportRequest):
+async def stock_report(req: StockReportRequest, request: Request):
     if not req.session_id:
         raise HTTPException(status_code=400, detail="session_id가 없습니다.")
     latest_chat_id = get_latest_chat_log_id(req.session_id)
@@ -594,30 +760,24 @@ async def stock_report(req: StockReportRequest):
         return StockReportResponse(symbol=symbol, report=report_row.report)
 
     chat_context = load_latest_session_context(req.session_id)
-    report_response = await run_stock_report(req, finn, client, chat_context)
-    db = SessionLocal()
-    try:
-        report_row = db.query(Report).filter(Report.session_id == req.session_id).first()
-        if report_row:
-            report_row.report = report_response.report
-            report_row.symbol = report_response.symbol
-            report_row.report_chat_id = latest_chat_id
-            report_row.latest_chat_id = latest_chat_id
-        else:
-            report_row = Report(
-                session_id=req.session_id,
-                symbol=report_response.symbol,
-                report=report_response.report,
-                report_chat_id=latest_chat_id,
-                latest_chat_id=latest_chat_id,
-            )
-            db.add(report_row)
-        db.commit()
-    finally:
-        db.close()
 
-    return report_response
-    return await run_stock_report(req, finn, client, chat_context)
+    # 종목을 직접 지정했고 같은 독자/초점으로 일괄 생성(precompute)한 보고서가 신선하면 생성 없이 재사용
+    if req.symbol:
+        precomputed = load_symbol_report(req.symbol.strip().upper(), *report_audience_focus(req))
+        if precomputed:
+            save_session_report(req.session_id, precomputed.symbol, precomputed.report, latest_chat_id)
+            return StockReportResponse(symbol=precomputed.symbol, report=precomputed.report)
+
+    deadline = Deadline(REQUEST_DEADLINE_SEC)
+
+    async def generate_and_save():
+        report_response = await run_stock_report(req, get_finn(), get_client(), chat_context, deadline=deadline)
+        t_db = time.perf_counter()
+        save_session_report(req.session_id, report_response.symbol, report_response.report, latest_chat_id)
+        tracing.record("db", (time.perf_counter() - t_db) * 1000)
+        return report_response
+
+    return await run_until_disconnect(request, generate_and_save(), "stock_report", detach=True)
 
 # backend/app/main.py (파일 상단 import에 이미 asyncio/date/timedelta 있음)
 
@@ -639,24 +799,18 @@ async def market_overview(
     _=Depends(require_login),
 ):
     # "지수 현황"은 지수 대신 ETF 프록시로 보여주는 게 Finnhub에서 가장 안정적
-    symbols = [
-        "IVV",  # S&P500 proxy
-        "QQQ",  # Nasdaq100 proxy
-        "DIA",  # Dow proxy
-        "IWM",  # Russell2000 proxy
-        "TLT",  # 20Y bond proxy
-    ]
+    symbols = MARKET_OVERVIEW_SYMBOLS
 
     async def safe_quote(sym: str):
         try:
-            q = await finn.quote(sym)
+            q = await get_finn().quote(sym)
             return {"symbol": sym, "quote": q}
         except Exception as e:
             return {"symbol": sym, "error": str(e)}
 
     async def safe_news():
         try:
-            news = await finn.market_news(category=category)
+            news = await get_finn().market_news(category=category)
             if isinstance(news, list):
                 news = news[: max(1, min(int(news_limit), 30))]
             return news
@@ -0,0 +1,32 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+# 프로세스 단위 간단 카운터 (Prometheus 붙이기 전까지 /api/metrics 로 확인)
+_lock = threading.Lock()
+_counters: Dict[str, int] = defaultdict(int)
+# 값 분포 요약: count/sum/max (평균은 sum/count)
+_observations: Dict[str, Dict[str, float]] = {}
+
+
+def inc(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] += n
+
+
+def observe(name: str, value: float) -> None:
+    with _lock:
+        o = _observations.get(name)
+        if o is None:
+            o = _observations[name] = {"count": 0, "sum": 0.0, "max": value}
+        o["count"] += 1
+        o["sum"] += value
+        o["max"] = max(o["max"], value)
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        out: Dict[str, Any] = dict(_counters)
+        for name, o in _observations.items():
+            out[name] = {**o, "avg": o["sum"] / o["count"] if o["count"] else 0.0}
+        return out
@@ -0,0 +1,171 @@
+"""Finnhub company-news 로컬 저장소.
+
+요청마다 10일/30일 창 전체를 받지 않고, 종목별로 마지막에 본 기사 이후(delta)만 받아
+SQLite에 (symbol, news_id)로 중복 제거해 쌓는다. 어떤 창이든 저장소에서 잘라서 응답.
+"""
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .config import NEWS_SYNC_MIN_INTERVAL_SEC, NEWS_RETENTION_DAYS
+from .db import SessionLocal, CompanyNews, NewsSyncState
+from .deadline import Deadline, DeadlineExceeded
+from . import tracing
+
+# 같은 종목 동시 요청 → 한 번만 수집
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _day_start_ts(d: date) -> int:
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp())
+
+
+def _ts_date(ts: int) -> date:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).date()
+
+
+def _sync_range(state: Optional[NewsSyncState], frm: date, today: date) -> Optional[Tuple[date, date]]:
+    if state is None or frm < date.fromisoformat(state.covered_from):
+        # 처음 보는 종목이거나 더 긴 창 요청(10일 → 30일): 창 전체를 한 번 받아 채움
+        return frm, today
+    if (datetime.utcnow() - state.synced_at).total_seconds() >= NEWS_SYNC_MIN_INTERVAL_SEC:
+        # Finnhub from/to는 날짜 단위 → 마지막 기사 날짜부터 다시 받고 중복은 PK로 무시
+        since = _ts_date(state.last_datetime) if state.last_datetime else state.synced_at.date()
+        return min(since, today), today
+    return None
+
+
+def _store(symbol: str, items: Any, frm: date) -> None:
+    rows = []
+    for n in items if isinstance(items, list) else []:
+        if not isinstance(n, dict) or n.get("id") is None or n.get("datetime") is None:
+            continue
+        rows.append({
+            "symbol": symbol,
+            "news_id": int(n["id"]),
+            "datetime": int(n["datetime"]),
+            "payload": json.dumps(n, ensure_ascii=False, separators=(",", ":")),
+        })
+
+    db = SessionLocal()
+    try:
+        if rows:
+            db.execute(sqlite_insert(CompanyNews).values(rows).on_conflict_do_nothing())
+
+        # 보관 기간 지난 기사 정리
+        cutoff = _day_start_ts(date.today() - timedelta(days=NEWS_RETENTION_DAYS))
+        db.query(CompanyNews).filter(CompanyNews.symbol == symbol, CompanyNews.datetime < cutoff).delete()
+        retained_from = _ts_date(cutoff).isoformat()
+
+        # 워커 여러 개가 같은 종목을 처음 동시에 수집해도 PK 충돌 없이 합쳐지게 upsert
+        # (_locks는 프로세스 안에서만 유효)
+        newest = max((r["datetime"] for r in rows), default=None)
+        stmt = sqlite_insert(NewsSyncState).values(
+            symbol=symbol,
+            covered_from=max(frm.isoformat(), retained_from),
+            last_datetime=newest,
+            synced_at=datetime.utcnow(),
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[NewsSyncState.symbol],
+            set_={
+                "covered_from": func.max(
+                    func.min(NewsSyncState.covered_from, stmt.excluded.covered_from), retained_from
+                ),
+                # sqlite max()는 인자에 NULL이 있으면 NULL → 한쪽만 있을 때를 coalesce로 처리
+                "last_datetime": func.coalesce(
+                    func.max(NewsSyncState.last_datetime, stmt.excluded.last_datetime),
+                    NewsSyncState.last_datetime,
+                    stmt.excluded.last_datetime,
+                ),
+                "synced_at": stmt.excluded.synced_at,
+            },
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _load(symbol: str, frm: date, to: date, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(CompanyNews.payload)
+            .filter(
+                CompanyNews.symbol == symbol,
+                CompanyNews.datetime >= _day_start_ts(frm),
+                CompanyNews.datetime < _day_start_ts(to + timedelta(days=1)),
+            )
+            # 같은 시각 기사끼리도 순서 고정 (프롬프트가 바이트 단위로 같아야 함)
+            .order_by(CompanyNews.datetime.desc(), CompanyNews.news_id.desc())
+        )
+        # 호출측은 최신 몇 개만 씀 → 창 전체를 읽고 json.loads 하지 않게 SQL에서 자름
+        rows = (query.limit(limit) if limit else query).all()
+        # Finnhub 응답과 같은 최신순
+        return [json.loads(r.payload) for r in rows]
+    finally:
+        db.close()
+
+
+async def company_news(
+    finn,
+    symbol: str,
+    _from: str,
+    to: str,
+    deadline: Optional[Deadline] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """finn.news()와 같은 결과(최신순, limit개까지)를 저장소 경유로 돌려준다."""
+    symbol = symbol.upper()
+    frm, to_d = date.fromisoformat(_from), date.fromisoformat(to)
+    today = date.today()
+    t0 = time.perf_counter()
+    outcome = "store"
+
+    lock = _locks.setdefault(symbol, asyncio.Lock())
+    # 잠금 대기도 마감 안에서: 마감 없는 호출(/api/tools/news 등)이 수집 중이어도 오래 묶이지 않게
+    try:
+        if deadline is None:
+            await lock.acquire()
+        else:
+            await deadline.run(lock.acquire(), f"news-store lock {symbol}")
+    except DeadlineExceeded:
+        # 다른 요청이 수집 중 → 지금까지 쌓인 뉴스로 응답 (없으면 실패)
+        news = _load(symbol, frm, to_d, limit)
+        tracing.record("news-store", (time.perf_counter() - t0) * 1000, "locked")
+        if not news:
+            raise
+        return news
+    try:
+        db = SessionLocal()
+        try:
+            state = db.get(NewsSyncState, symbol)
+            # 보관 기간보다 긴 창은 보관분까지만 채움 (매번 재수집 방지)
+            retained = today - timedelta(days=NEWS_RETENTION_DAYS)
+            sync = _sync_range(state, max(frm, retained), today)
+        finally:
+            db.close()
+
+        if sync is not None:
+            r_from, r_to = sync
+            try:
+                items = await finn.news(symbol, r_from.isoformat(), r_to.isoformat(), deadline=deadline, ttl=None)
+                _store(symbol, items, r_from)
+                outcome = "delta"
+            except Exception as e:
+                if state is None:
+                    raise
+                # 이미 쌓인 뉴스가 있으면 조금 오래된 데이터로 응답
+                print(f"[NewsStore] delta fetch failed for {symbol}: {e}")
+                outcome = "stale"
+    finally:
+        lock.release()
+
+    news = _load(symbol, frm, to_d, limit)
+    tracing.record("news-store", (time.perf_counter() - t0) * 1000, outcome)
+    return news
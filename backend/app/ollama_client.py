@@ -1,20 +1,101 @@
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional
 import httpx
 
-from .config import OLLAMA_BASE_URL, OLLAMA_MODEL, REQUEST_TIMEOUT_SEC
+from .config import OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_EMBED_MODEL, OLLAMA_EMBED_TIMEOUT_SEC, REQUEST_TIMEOUT_SEC
+from .deadline import Deadline
+from . import tracing
+from . import metrics
 
 class OllamaClient:
     def __init__(self) -> None:
         self.base_url = OLLAMA_BASE_URL
         self.model = OLLAMA_MODEL
 
-    async def chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def chat(self, payload: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         url = f"{self.base_url}/api/chat"
-        timeout = httpx.Timeout(REQUEST_TIMEOUT_SEC)
+        if deadline is None:
+            timeout = httpx.Timeout(REQUEST_TIMEOUT_SEC)
+        else:
+            timeout = deadline.timeout(cap=REQUEST_TIMEOUT_SEC)
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            r = await client.post(url, json=payload)
+        async def post():
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                return await client.post(url, json=payload)
+
+        model = payload.get("model") or self.model
+        metrics.inc(f"ollama.{model}.requests")
+        t0 = time.perf_counter()
+        with tracing.stage("ollama", model):
+            if deadline is None:
+                r = await post()
+            else:
+                r = await deadline.run(post(), "Ollama chat")
+        wall_ms = (time.perf_counter() - t0) * 1000
 
         # Ollama가 에러면 바로 텍스트로 올라오기도 함
         r.raise_for_status()
-        return r.json()
\ No newline at end of file
+        data = r.json()
+        record_ollama_timings(data, wall_ms)
+        record_model_stats(model, data, wall_ms)
+        return data
+
+    async def keep_alive(
+        self,
+        model: str,
+        keep_alive: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout_sec: float = REQUEST_TIMEOUT_SEC,
+    ) -> Dict[str, Any]:
+        # 프롬프트 없는 generate = 모델만 로드하고 keep_alive 갱신 (생성 없음)
+        # options(num_ctx)가 실제 요청과 다르면 Ollama가 그 컨텍스트로 러너를 다시 띄우므로 같이 보냄
+        url = f"{self.base_url}/api/generate"
+        body: Dict[str, Any] = {"model": model, "keep_alive": keep_alive}
+        if options:
+            body["options"] = options
+        async with httpx.AsyncClient(timeout=httpx.Timeout(timeout_sec)) as client:
+            r = await client.post(url, json=body)
+        r.raise_for_status()
+        return r.json()
+
+    async def embed(self, text: str, deadline: Optional[Deadline] = None) -> List[float]:
+        url = f"{self.base_url}/api/embeddings"
+        if deadline is None:
+            timeout = httpx.Timeout(OLLAMA_EMBED_TIMEOUT_SEC)
+        else:
+            timeout = deadline.timeout(cap=OLLAMA_EMBED_TIMEOUT_SEC)
+
+        async def post():
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                return await client.post(url, json={"model": OLLAMA_EMBED_MODEL, "prompt": text})
+
+        with tracing.stage("embed"):
+            if deadline is None:
+                r = await post()
+            else:
+                r = await deadline.run(post(), "Ollama embed")
+        r.raise_for_status()
+        return r.json().get("embedding") or []
+
+
+def record_model_stats(model: str, data: Dict[str, Any], wall_ms: float) -> None:
+    # 라우팅 튜닝용: 모델별 지연/토큰 수/생성 속도
+    metrics.observe(f"ollama.{model}.latency_ms", wall_ms)
+    metrics.observe(f"ollama.{model}.prompt_tokens", data.get("prompt_eval_count") or 0)
+    metrics.observe(f"ollama.{model}.gen_tokens", data.get("eval_count") or 0)
+    eval_ns = data.get("eval_duration") or 0
+    if eval_ns:
+        metrics.observe(f"ollama.{model}.tokens_per_sec", (data.get("eval_count") or 0) / (eval_ns / 1e9))
+
+
+def record_ollama_timings(data: Dict[str, Any], wall_ms: float) -> None:
+    # Ollama 응답의 *_duration은 ns 단위. 벽시계 - total_duration ≈ 큐 대기 + 전송
+    ns = 1_000_000
+    total_ms = (data.get("total_duration") or 0) / ns
+    if total_ms:
+        tracing.record("queue", max(0.0, wall_ms - total_ms))
+    tracing.record("load", (data.get("load_duration") or 0) / ns)
+    tracing.record("prompt-eval", (data.get("prompt_eval_duration") or 0) / ns)
+    tracing.record("gen", (data.get("eval_duration") or 0) / ns)
+    tracing.add_size("prompt_tokens", data.get("prompt_eval_count") or 0)
+    tracing.add_size("gen_tokens", data.get("eval_count") or 0)
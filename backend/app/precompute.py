@@ -0,0 +1,199 @@
+"""관심종목 보고서 일괄 생성.
+
+    python -m backend.app.precompute IVV QQQ AAPL
+    python -m backend.app.precompute --file watchlist.txt --llm-concurrency 2
+
+- Finnhub 데이터는 분당 호출 제한(FINNHUB_RATE_PER_MIN)을 지키며 --fetch-concurrency개씩 배치로 받고,
+  받은 종목부터 LLM 워커(--llm-concurrency개)가 보고서를 만든다.
+  생성 중인 종목 + 한 배치보다 앞서 받지 않는다 (늦게 생성되는 보고서의 quote가 오래되지 않게).
+- 종목마다 끝나는 즉시 symbol_reports 테이블에 저장 → 중간에 끊겨도 다시 돌리면
+  SYMBOL_REPORT_MAX_AGE_SEC 안에 만든 종목은 건너뜀(--force로 무시).
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .config import (
+    FINNHUB_RATE_PER_MIN,
+    PRECOMPUTE_FETCH_CONCURRENCY,
+    PRECOMPUTE_LLM_CONCURRENCY,
+    SYMBOL_REPORT_MAX_AGE_SEC,
+    REQUEST_DEADLINE_SEC,
+)
+from .db import SessionLocal, SymbolReport, init_db
+from .deadline import Deadline
+from .finnhub_client import FinnhubClient, RateLimiter, fetch_bundle, technical_digests
+from .ollama_client import OllamaClient
+from .report_agent import report_audience_focus, run_stock_report
+from .schemas import StockReportRequest
+
+# 세션 대화가 없으므로 보고서 프롬프트의 [대화 내역] 자리에 들어갈 문구
+WATCHLIST_CONTEXT = "(대화 없음: 관심종목 일괄 생성 보고서. 일반 장기 투자자 관점으로 작성)"
+
+
+def fresh_symbols(symbols: List[str], max_age_sec: int) -> set:
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_sec)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(SymbolReport.symbol)
+            .filter(SymbolReport.symbol.in_(symbols), SymbolReport.generated_at >= cutoff)
+            .all()
+        )
+        return {r.symbol for r in rows}
+    finally:
+        db.close()
+
+
+def load_symbol_report(
+    symbol: str,
+    audience: Optional[str] = None,
+    focus: Optional[str] = None,
+    max_age_sec: int = SYMBOL_REPORT_MAX_AGE_SEC,
+) -> Optional[SymbolReport]:
+    """신선한 보고서. audience/focus를 주면 저장된 값과 같을 때만 (다르면 None → 호출측이 새로 생성)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_sec)
+    db = SessionLocal()
+    try:
+        query = db.query(SymbolReport).filter(SymbolReport.symbol == symbol, SymbolReport.generated_at >= cutoff)
+        if audience is not None:
+            query = query.filter(SymbolReport.audience == audience)
+        if focus is not None:
+            query = query.filter(SymbolReport.focus == focus)
+        return query.first()
+    finally:
+        db.close()
+
+
+def save_symbol_report(symbol: str, report: str, audience: str, focus: str) -> None:
+    db = SessionLocal()
+    try:
+        row = db.query(SymbolReport).filter(SymbolReport.symbol == symbol).first()
+        if row is None:
+            row = SymbolReport(symbol=symbol)
+            db.add(row)
+        row.report = report
+        row.audience = audience
+        row.focus = focus
+        row.generated_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+async def precompute(
+    symbols: List[str],
+    fetch_concurrency: int = PRECOMPUTE_FETCH_CONCURRENCY,
+    llm_concurrency: int = PRECOMPUTE_LLM_CONCURRENCY,
+    force: bool = False,
+) -> Dict[str, str]:
+    """종목별 결과("ok" / "skipped" / "error: ...")를 돌려준다."""
+    init_db()
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    results: Dict[str, str] = {}
+
+    if not force:
+        for sym in fresh_symbols(symbols, SYMBOL_REPORT_MAX_AGE_SEC):
+            results[sym] = "skipped"
+    todo = [s for s in symbols if s not in results]
+    print(f"[precompute] {len(todo)}개 생성, {len(results)}개 건너뜀(최근 생성)")
+
+    finn = FinnhubClient(limiter=RateLimiter(FINNHUB_RATE_PER_MIN))
+    client = OllamaClient()
+    batch_size = max(1, fetch_concurrency)
+    llm_n = max(1, llm_concurrency)
+    # 데이터를 받았지만 아직 생성이 안 끝난 종목 수 상한(생성 중 + 다음 배치 하나).
+    # 생성이 밀리면 다음 배치 수집(일봉 포함)도 시작하지 않아 quote가 오래되지 않게
+    slots = asyncio.Semaphore(batch_size + llm_n)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def fetch_one(sym: str, digest: Optional[Dict[str, Any]]):
+        try:
+            bundle = await fetch_bundle(finn, sym, news_days=30, news_limit=8, with_technical=False)
+        except BaseException:
+            slots.release()
+            raise
+        bundle["technical"] = digest
+        if bundle["quote"] is None and bundle["profile"] is None:
+            results[sym] = f"error: Finnhub {bundle['errors']}"
+            slots.release()
+            return
+        await queue.put((sym, bundle))
+
+    async def produce():
+        for i in range(0, len(todo), batch_size):
+            batch = todo[i:i + batch_size]
+            for _ in batch:
+                await slots.acquire()
+            # 일봉 지표는 배치 단위 행렬 한 번으로 계산 (전 종목을 먼저 받으면 그동안 LLM이 놂)
+            digests = await technical_digests(finn, batch)
+            await asyncio.gather(*[fetch_one(sym, digests.get(sym)) for sym in batch])
+
+    async def llm_worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            sym, bundle = item
+            t0 = time.perf_counter()
+            try:
+                req = StockReportRequest(symbol=sym)
+                resp = await run_stock_report(
+                    req, finn, client, WATCHLIST_CONTEXT,
+                    deadline=Deadline(REQUEST_DEADLINE_SEC), bundle=bundle,
+                )
+                save_symbol_report(sym, resp.report, *report_audience_focus(req))
+                results[sym] = "ok"
+                print(f"[precompute] {sym} ok ({time.perf_counter() - t0:.1f}s)")
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                results[sym] = f"error: {detail}"
+                print(f"[precompute] {sym} 실패: {detail}")
+            finally:
+                slots.release()
+                queue.task_done()
+
+    workers = [asyncio.create_task(llm_worker()) for _ in range(llm_n)]
+    await produce()
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="관심종목 보고서 일괄 생성")
+    parser.add_argument("symbols", nargs="*", help="티커 목록")
+    parser.add_argument("--file", help="한 줄에 티커 하나 (#은 주석)")
+    parser.add_argument("--fetch-concurrency", type=int, default=PRECOMPUTE_FETCH_CONCURRENCY)
+    parser.add_argument("--llm-concurrency", type=int, default=PRECOMPUTE_LLM_CONCURRENCY)
+    parser.add_argument("--force", action="store_true", help="최근 생성된 종목도 다시 생성")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    symbols.append(line)
+    if not symbols:
+        parser.error("티커를 인자나 --file로 지정하세요.")
+
+    results = asyncio.run(
+        precompute(symbols, args.fetch_concurrency, args.llm_concurrency, force=args.force)
+    )
+    failed = {s: r for s, r in results.items() if r.startswith("error")}
+    ok = sum(1 for r in results.values() if r == "ok")
+    print(f"[precompute] 완료: 생성 {ok}, 건너뜀 {len(results) - ok - len(failed)}, 실패 {len(failed)}")
+    for s, r in failed.items():
+        print(f"  {s}: {r}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""프롬프트 템플릿 (prompt_templates/*.txt).
+
+- 템플릿 파일은 import 시점에 한 번 읽어 (고정 문자열, 필드명) 조각으로 미리 쪼개 둔다
+- 데이터 섹션은 repr() 대신 키 정렬 + 공백 없는 JSON → 같은 입력이면 항상 같은 바이트
+  (프롬프트 비교/캐시 가능, Ollama가 앞부분 KV 캐시를 재사용)
+- JSON 직렬화는 Finnhub 캐시 객체 단위로 메모: 메모리 캐시 hit이면 같은 객체가 돌아오므로 다시 안 만듦
+"""
+import json
+import string
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .indicators import format_digest
+from . import metrics
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "prompt_templates"
+_JSON_MEMO_MAX = 256
+
+
+class PromptTemplate:
+    def __init__(self, name: str, text: str) -> None:
+        self.name = name
+        self.parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, spec, conv in string.Formatter().parse(text):
+            if spec or conv:
+                raise ValueError(f"{name}: 서식 지정자는 지원하지 않음 ({{{field}!{conv}:{spec}}})")
+            self.parts.append((literal, field))
+        self.fields = {field for _, field in self.parts if field is not None}
+
+    def render(self, **values: str) -> str:
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"{self.name}: 값 없음 {sorted(missing)}")
+        out = []
+        for literal, field in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(values[field])
+        return "".join(out)
+
+
+def _load_templates() -> Dict[str, PromptTemplate]:
+    return {
+        path.stem: PromptTemplate(path.stem, path.read_text(encoding="utf-8").strip())
+        for path in sorted(TEMPLATE_DIR.glob("*.txt"))
+    }
+
+
+TEMPLATES = _load_templates()
+
+# id(객체) → (객체, JSON). 객체를 같이 잡아둬서 id 재사용으로 엉뚱한 값이 나오지 않게
+_json_memo: "OrderedDict[int, Tuple[Any, str]]" = OrderedDict()
+
+
+def to_json(data: Any) -> str:
+    if not isinstance(data, (dict, list)):
+        return json.dumps(data, ensure_ascii=False)
+    key = id(data)
+    hit = _json_memo.get(key)
+    if hit is not None and hit[0] is data:
+        _json_memo.move_to_end(key)
+        metrics.inc("prompt_json_memo_hit")
+        return hit[1]
+    text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    _json_memo[key] = (data, text)
+    while len(_json_memo) > _JSON_MEMO_MAX:
+        _json_memo.popitem(last=False)
+    return text
+
+
+def bundle_sections(bundle: Dict[str, Any]) -> Dict[str, str]:
+    """fetch_bundle 결과 → 템플릿 데이터 필드."""
+    return {
+        "quote": to_json(bundle["quote"]),
+        "profile": to_json(bundle["profile"]),
+        "metrics": to_json(bundle["metrics"]),
+        "news": to_json(bundle["news"]),
+        "technical": format_digest(bundle["technical"]),
+    }
+
+
+def render(name: str, **values: str) -> str:
+    return TEMPLATES[name].render(**values)
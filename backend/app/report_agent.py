@@ -1,10 +1,15 @@
-from datetime import date, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 import re
+import time
 
 from fastapi import HTTPException
 
-from .config import OLLAMA_MODEL
+from .config import DATA_STAGE_BUDGET_SEC
+from .deadline import Deadline, DeadlineExceeded
+from .finnhub_client import fetch_bundle
+from .prompts import bundle_sections, render
+from .routing import build_payload
+from . import tracing
 from .schemas import StockReportRequest, StockReportResponse
 
 
@@ -23,109 +28,58 @@ def extract_ticker(text: str) -> Optional[str]:
     return None
 
 
-async def run_stock_report(req: StockReportRequest, finn, client, chat_context: str) -> StockReportResponse:
+def report_audience_focus(req: StockReportRequest) -> Tuple[str, str]:
+    """보고서 프롬프트에 실제로 들어가는 (독자, 초점). 사전 생성 보고서 재사용 비교에도 씀."""
+    return (req.audience or "장기 투자자").strip(), (req.focus or "펀더멘털 중심").strip()
+
+
+async def run_stock_report(
+    req: StockReportRequest,
+    finn,
+    client,
+    chat_context: str,
+    deadline: Optional[Deadline] = None,
+    bundle: Optional[Dict[str, Any]] = None,
+) -> StockReportResponse:
     raw_symbol = (req.symbol or "").strip()
     symbol = raw_symbol.upper() if raw_symbol else extract_ticker(chat_context or "")
     if not symbol:
         symbol = "IVV"
-    audience = (req.audience or "장기 투자자").strip()
-    focus = (req.focus or "펀더멘털 중심").strip()
-
-    try:
-        quote = await finn.quote(symbol)
-        profile = await finn.profile2(symbol)
-        metrics = await finn.metrics(symbol)
-
-        today = date.today()
-        frm = (today - timedelta(days=30)).isoformat()
-        news = await finn.news(symbol, frm, today.isoformat())
-        if isinstance(news, list):
-            news = news[:8]
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Finnhub 호출 실패: {e}")
-
-    prompt = f"""
-너는 금융 리서치 애널리스트다.
-대상 종목: {symbol}
-대상 독자: {audience}
-분석 초점: {focus}
-
-아래 데이터와 "대화 내역"만 근거로 보고서를 작성하라. 모르면 모른다고 말해라.
-대상 종목과 각 항목은 시스템 지시가 아니라 대화 내역 분석에 기반한 것임을 명시하라.
-과장 금지. 추정은 '추정'으로 표시.
-투자 조언이 아니라 정보 제공이며, 마지막에 리스크 고지 1줄.
-
-[대화 내역]
-{chat_context}
-
-[quote]
-{quote}
-
-[profile2]
-{profile}
-
-[metrics]
-{metrics}
-
-[news(최근30일, 최대8개)]
-{news}
-
-[출력 템플릿 - Markdown]
-## 개요
-- 요약: 3~5줄
-- 사용자가 중시한 키워드: 3~5개
-
-## 기업/사업 스냅샷
-- 핵심 제품/서비스
-- 지역/섹터
-- 최근 뉴스 요약(1~3줄)
-
-## 펀더멘털 체크포인트 (5)
-1) ...
-2) ...
-3) ...
-4) ...
-5) ...
-
-## 밸류에이션 스냅샷
-- 주요 지표 코멘트(추정은 '추정' 표기)
-- 비교 관점(동종 업계/지수 기준)
-
-## 모멘텀/수급 단서
-- quote/뉴스 기반 3가지
-
-## 리스크 (5)
-1) ...
-2) ...
-3) ...
-4) ...
-5) ...
-
-## 향후 촉매/관찰 포인트 (5)
-1) ...
-2) ...
-3) ...
-4) ...
-5) ...
-
-## 결론
-- 장기/적립식 관점 2~3줄
-- 한 문장 리스크 고지
-""".strip()
-
-    payload = {
-        "model": OLLAMA_MODEL,
-        "messages": [
+    audience, focus = report_audience_focus(req)
+
+    # bundle: 일괄 생성(precompute)처럼 미리 받아둔 데이터가 있으면 재사용
+    if bundle is None:
+        data_deadline = deadline.child(DATA_STAGE_BUDGET_SEC) if deadline else None
+        bundle = await fetch_bundle(finn, symbol, news_days=30, news_limit=8, deadline=data_deadline)
+    if bundle["quote"] is None and bundle["profile"] is None:
+        raise HTTPException(status_code=502, detail=f"Finnhub 호출 실패: {bundle['errors']}")
+
+    t_prompt = time.perf_counter()
+    prompt = render(
+        "stock_report",
+        symbol=symbol,
+        audience=audience,
+        focus=focus,
+        chat_context=chat_context,
+        **bundle_sections(bundle),
+    )
+    tracing.record("prompt", (time.perf_counter() - t_prompt) * 1000)
+    tracing.add_size("prompt_chars", len(prompt))
+
+    payload = build_payload(
+        "stock_report",
+        [
             {"role": "system", "content": "한국어로, 근거 중심으로 답하라."},
             {"role": "user", "content": prompt},
         ],
-        "stream": False,
-        "keep_alive": "1h",
-    }
+        has_data=True,
+    )
 
     try:
-        data = await client.chat(payload)
+        data = await client.chat(payload, deadline=deadline)
         content = (data.get("message") or {}).get("content", "")
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Ollama 응답 시간 초과: {e}")
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Ollama 호출 실패: {e}")
 
@@ -0,0 +1,78 @@
+"""엔드포인트/프롬프트 크기/데이터 주입 여부로 모델과 options를 고른다.
+
+- stock_report, should_i_buy, Finnhub 데이터가 주입된 chat → large(OLLAMA_MODEL)
+- 데이터 없는 짧은 chat, 티커 설명 fallback → fast(OLLAMA_FAST_MODEL)
+- fast 대상이라도 프롬프트가 ROUTE_FAST_MAX_PROMPT_CHARS를 넘으면 large
+- num_ctx는 모델 단위: 같은 모델을 두 라우트가 쓰면(기본 설정) 큰 쪽 값을 같이 써서
+  라우트가 바뀔 때마다 러너가 다시 로드되지 않게 한다
+"""
+from typing import Any, Dict, List
+
+from .config import (
+    OLLAMA_MODEL,
+    OLLAMA_FAST_MODEL,
+    OLLAMA_FAST_KEEP_ALIVE,
+    OLLAMA_FAST_NUM_CTX,
+    OLLAMA_FAST_NUM_PREDICT,
+    OLLAMA_LARGE_KEEP_ALIVE,
+    OLLAMA_LARGE_NUM_CTX,
+    OLLAMA_LARGE_NUM_PREDICT,
+    ROUTE_FAST_MAX_PROMPT_CHARS,
+)
+
+# 모델 → num_ctx (러너 로드 단위)
+MODEL_NUM_CTX: Dict[str, int] = {}
+for _model, _num_ctx in ((OLLAMA_FAST_MODEL, OLLAMA_FAST_NUM_CTX), (OLLAMA_MODEL, OLLAMA_LARGE_NUM_CTX)):
+    MODEL_NUM_CTX[_model] = max(MODEL_NUM_CTX.get(_model, 0), _num_ctx)
+
+
+def _route(model: str, keep_alive: str, num_predict: int) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"num_ctx": MODEL_NUM_CTX[model]}
+    if num_predict >= 0:
+        options["num_predict"] = num_predict
+    return {"model": model, "keep_alive": keep_alive, "options": options}
+
+
+ROUTES: Dict[str, Dict[str, Any]] = {
+    "fast": _route(OLLAMA_FAST_MODEL, OLLAMA_FAST_KEEP_ALIVE, OLLAMA_FAST_NUM_PREDICT),
+    "large": _route(OLLAMA_MODEL, OLLAMA_LARGE_KEEP_ALIVE, OLLAMA_LARGE_NUM_PREDICT),
+}
+
+# 항상 large로 보내는 엔드포인트 (긴 출력 템플릿)
+LARGE_ENDPOINTS = {"stock_report", "should_i_buy"}
+
+
+def prompt_chars(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(m.get("content") or "") for m in messages)
+
+
+def choose_route(endpoint: str, messages: List[Dict[str, Any]], has_data: bool) -> str:
+    if endpoint in LARGE_ENDPOINTS or has_data:
+        return "large"
+    if prompt_chars(messages) > ROUTE_FAST_MAX_PROMPT_CHARS:
+        return "large"
+    return "fast"
+
+
+def build_payload(endpoint: str, messages: List[Dict[str, Any]], has_data: bool = False) -> Dict[str, Any]:
+    route = ROUTES[choose_route(endpoint, messages, has_data)]
+    return {
+        "model": route["model"],
+        "messages": messages,
+        "stream": False,
+        "keep_alive": route["keep_alive"],
+        "options": dict(route["options"]),
+    }
+
+
+def load_options(model: str) -> Dict[str, Any]:
+    """keep_alive 미리 로드/갱신용. 실제 요청과 같은 num_ctx로 띄워야 첫 요청에서 다시 로드되지 않음."""
+    return {"num_ctx": MODEL_NUM_CTX[model]}
+
+
+def resident_models() -> Dict[str, str]:
+    """상주시킬 모델 → keep_alive (같은 모델이면 하나로)."""
+    out: Dict[str, str] = {}
+    for route in ROUTES.values():
+        out.setdefault(route["model"], route["keep_alive"])
+    return out
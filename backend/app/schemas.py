@@ -31,6 +31,11 @@ class StockReportResponse(BaseModel):
     symbol: str
     report: str
 
+class SymbolReportResponse(BaseModel):
+    symbol: str
+    report: str
+    generated_at: datetime
+
 class SessionSummary(BaseModel):
     id: str
     name: str
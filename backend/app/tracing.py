@@ -0,0 +1,123 @@
+import json
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import SLOW_REQUEST_MS, SLOW_LOG_PATH, SLOW_LOG_MAX_BYTES, SLOW_LOG_BACKUPS
+
+# 요청 하나의 단계별 소요시간 → Server-Timing 헤더 + 느린 요청 JSONL 로그
+_current: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.stages: List[Dict[str, Any]] = []
+        self.sizes: Dict[str, int] = {}
+
+    def add(self, name: str, dur_ms: float, desc: Optional[str] = None) -> None:
+        self.stages.append({"name": name, "dur": round(dur_ms, 1), "desc": desc})
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        parts = []
+        for s in self.stages:
+            part = f"{s['name']};dur={s['dur']}"
+            if s["desc"]:
+                part += f';desc="{s["desc"]}"'
+            parts.append(part)
+        parts.append(f"total;dur={round(self.elapsed_ms(), 1)}")
+        return ", ".join(parts)
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+def record(name: str, dur_ms: float, desc: Optional[str] = None) -> None:
+    t = _current.get()
+    if t is not None:
+        t.add(name, dur_ms, desc)
+
+
+def add_size(name: str, n: int) -> None:
+    t = _current.get()
+    if t is not None:
+        t.sizes[name] = t.sizes.get(name, 0) + n
+
+
+@contextmanager
+def stage(name: str, desc: Optional[str] = None):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - t0) * 1000, desc)
+
+
+def _slow_logger() -> logging.Logger:
+    logger = logging.getLogger("slow_requests")
+    if not logger.handlers:
+        Path(SLOW_LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(SLOW_LOG_PATH, maxBytes=SLOW_LOG_MAX_BYTES, backupCount=SLOW_LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class ServerTimingMiddleware:
+    """순수 ASGI 미들웨어 (BaseHTTPMiddleware는 request.is_disconnected()를 가려서 사용 안 함)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        trace = Trace(scope.get("method", ""), scope.get("path", ""))
+        token = _current.set(trace)
+        status = 0
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                trace.sizes["request_bytes"] = trace.sizes.get("request_bytes", 0) + len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1", "replace")))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                trace.sizes["response_bytes"] = trace.sizes.get("response_bytes", 0) + len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            _current.reset(token)
+            total = trace.elapsed_ms()
+            if SLOW_REQUEST_MS > 0 and total >= SLOW_REQUEST_MS:
+                _slow_logger().info(json.dumps({
+                    "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "method": trace.method,
+                    "path": trace.path,
+                    "status": status,
+                    "total_ms": round(total, 1),
+                    "stages": trace.stages,
+                    "sizes": trace.sizes,
+                }, ensure_ascii=False))
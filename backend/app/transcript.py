@@ -0,0 +1,35 @@
+"""chat_logs.message 인코딩.
+
+새 행은 zlib 압축 + base64를 "z1:" 접두어와 함께 저장. 접두어 없는 옛 행은 평문 JSON으로 읽음.
+"""
+import base64
+import json
+import zlib
+from typing import Any, Dict
+
+ZLIB_PREFIX = "z1:"
+# 이보다 짧으면 압축 이득이 없어 평문으로 저장
+COMPRESS_MIN_CHARS = 512
+
+
+def encode_message(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, ensure_ascii=True)
+    return compress_raw(raw)
+
+
+def compress_raw(raw: str) -> str:
+    if raw.startswith(ZLIB_PREFIX) or len(raw) < COMPRESS_MIN_CHARS:
+        return raw
+    packed = ZLIB_PREFIX + base64.b64encode(zlib.compress(raw.encode("utf-8"), 6)).decode("ascii")
+    return packed if len(packed) < len(raw) else raw
+
+
+def decode_message(stored: str) -> Dict[str, Any]:
+    """깨진 행은 {} (기존 읽기 코드와 같은 동작)."""
+    try:
+        if stored.startswith(ZLIB_PREFIX):
+            stored = zlib.decompress(base64.b64decode(stored[len(ZLIB_PREFIX):])).decode("utf-8")
+        payload = json.loads(stored)
+        return payload if isinstance(payload, dict) else {}
+    except Exception:
+        return {}
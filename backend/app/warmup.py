@@ -0,0 +1,60 @@
+"""기동 직후 첫 요청이 떠안던 비용을 미리 치른다.
+
+- 라우팅 대상 모델 로드 (빈 generate + keep_alive, 실제 요청과 같은 num_ctx)
+- 시장 개요 종목 quote / 시장 뉴스로 Finnhub 캐시 채우기
+- SQLite 커넥션 풀 미리 열기
+"""
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from .config import WARMUP_STEP_TIMEOUT_SEC, WARMUP_DB_CONNECTIONS
+from .db import engine
+from .routing import load_options, resident_models
+
+
+def _open_db_connections(n: int) -> None:
+    # 동시에 n개를 꺼냈다 돌려놔야 풀에 n개가 남는다
+    conns = [engine.connect() for _ in range(max(1, n))]
+    try:
+        for conn in conns:
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+async def _prime_finnhub(finn, symbols: List[str]) -> None:
+    results = await asyncio.gather(
+        *[finn.quote(s) for s in symbols], finn.market_news("general"), return_exceptions=True
+    )
+    errors = [str(r) for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise RuntimeError(f"{len(errors)}/{len(results)} 실패: {errors[0]}")
+
+
+async def warm_up(client, finn, market_symbols: List[str]) -> Dict[str, Any]:
+    """단계별 {"ok", "ms", "error"}. 실패해도 예외 없이 결과만 돌려준다."""
+    results: Dict[str, Any] = {}
+
+    async def step(name: str, coro) -> None:
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(coro, timeout=WARMUP_STEP_TIMEOUT_SEC)
+            results[name] = {"ok": True, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+        except Exception as e:
+            results[name] = {
+                "ok": False,
+                "ms": round((time.perf_counter() - t0) * 1000, 1),
+                "error": str(e) or type(e).__name__,
+            }
+            print(f"[Warmup] {name} failed: {results[name]['error']}")
+
+    await asyncio.gather(
+        step("db", asyncio.to_thread(_open_db_connections, WARMUP_DB_CONNECTIONS)),
+        step("finnhub", _prime_finnhub(finn, market_symbols)),
+        *[step(f"model:{m}", client.keep_alive(m, ka, load_options(m))) for m, ka in resident_models().items()],
+    )
+    return results
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from backend.app import answer_cache as ac
+from backend.app import main
+from backend.app.answer_cache import EmbedBackoff, SemanticAnswerCache, data_version
+
+BUNDLE = {"quote": {"t": 1700000000, "c": 412.5}}
+GROUP = ("should_i_buy", "IVV", data_version(BUNDLE))
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(ac, "time", c)
+    return c
+
+
+def test_data_version_requires_quote_time():
+    assert data_version(BUNDLE) == "1700000000:412.5"
+    assert data_version({"quote": {"c": 1.0}}) is None
+    assert data_version(None) is None
+
+
+def test_exact_hit_ignores_case_and_spacing(clock):
+    cache = SemanticAnswerCache()
+    cache.put(GROUP, "IVV 사도 돼?", None, "answer")
+    assert cache.lookup_exact(GROUP, "  ivv   사도 돼? ") == "answer"
+    assert cache.lookup_exact(GROUP, "IVV 팔아야 돼?") is None
+
+
+def test_similarity_threshold(clock):
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.put(GROUP, "q1", [1.0, 0.0], "answer")
+    answer, sim = cache.lookup(GROUP, [0.95, 0.1])
+    assert answer == "answer" and sim > 0.9
+    assert cache.lookup(GROUP, [0.5, 0.5]) is None  # cos = 0.707
+    assert cache.lookup(GROUP, [1.0, 0.0, 0.0]) is None  # 차원 다르면 비교 안 함
+
+
+def test_ttl_expiry(clock):
+    cache = SemanticAnswerCache(ttl_sec=60)
+    cache.put(GROUP, "q1", [1.0, 0.0], "answer")
+    clock.now += 59
+    assert cache.lookup_exact(GROUP, "q1") == "answer"
+    clock.now += 2
+    assert cache.lookup_exact(GROUP, "q1") is None
+    assert cache.lookup(GROUP, [1.0, 0.0]) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(clock):
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.put(GROUP, "q1", None, "a1")
+    cache.put(GROUP, "q2", None, "a2")
+    assert cache.lookup_exact(GROUP, "q1") == "a1"  # q1을 최근 사용으로
+    cache.put(GROUP, "q3", None, "a3")
+    assert len(cache) == 2
+    assert cache.lookup_exact(GROUP, "q2") is None
+    assert cache.lookup_exact(GROUP, "q1") == "a1"
+    assert cache.lookup_exact(GROUP, "q3") == "a3"
+
+
+def test_version_change_uses_other_group(clock):
+    cache = SemanticAnswerCache()
+    cache.put(GROUP, "q1", [1.0, 0.0], "old")
+    moved = ("should_i_buy", "IVV", data_version({"quote": {"t": 1700000060, "c": 413.0}}))
+    assert cache.lookup_exact(moved, "q1") is None
+    assert cache.lookup(moved, [1.0, 0.0]) is None
+
+
+def test_embed_backoff(clock):
+    backoff = EmbedBackoff(max_failures=2, backoff_sec=30)
+    assert backoff.allow()
+    assert backoff.failure() is False
+    assert backoff.failure() is True
+    assert not backoff.allow()
+    clock.now += 31
+    assert backoff.allow()
+
+
+class FakeClient:
+    """Ollama /api/embeddings 대신: 질문별 고정 벡터, 없으면 예외."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = 0
+
+    async def embed(self, text, deadline=None):
+        self.calls += 1
+        if text not in self.vectors:
+            raise RuntimeError("model not found")
+        return self.vectors[text]
+
+
+@pytest.fixture
+def fake_main(monkeypatch, clock):
+    monkeypatch.setattr(main, "ANSWER_CACHE_ENABLED", True)
+    monkeypatch.setattr(main, "answer_cache", SemanticAnswerCache(threshold=0.9))
+    monkeypatch.setattr(main, "embed_backoff", EmbedBackoff(max_failures=2, backoff_sec=60))
+
+    def install(vectors):
+        client = FakeClient(vectors)
+        monkeypatch.setattr(main, "get_client", lambda: client)
+        return client
+
+    return install
+
+
+def lookup(question, bundle=BUNDLE):
+    return asyncio.run(main.lookup_answer_cache("should_i_buy", "IVV", bundle, question))
+
+
+def test_lookup_answer_cache_semantic_hit(fake_main):
+    fake_main({"IVV 사도 돼?": [1.0, 0.0], "IVV 지금 사도 될까?": [0.98, 0.05]})
+    group, embedding, answer = lookup("IVV 사도 돼?")
+    assert group == GROUP and answer is None
+    main.answer_cache.put(group, "IVV 사도 돼?", embedding, "cached answer")
+
+    _, _, answer = lookup("IVV 지금 사도 될까?")
+    assert answer == "cached answer"
+
+
+def test_lookup_answer_cache_exact_hit_skips_embed(fake_main):
+    client = fake_main({})
+    main.answer_cache.put(GROUP, "IVV 사도 돼?", None, "cached answer")
+    _, _, answer = lookup("ivv 사도 돼?")
+    assert answer == "cached answer"
+    assert client.calls == 0
+
+
+def test_lookup_answer_cache_without_quote_version(fake_main):
+    client = fake_main({})
+    assert lookup("IVV 사도 돼?", bundle={"quote": None}) == (None, None, None)
+    assert client.calls == 0
+
+
+def test_lookup_answer_cache_backs_off_after_embed_failures(fake_main, clock):
+    client = fake_main({})
+    for _ in range(2):
+        group, embedding, answer = lookup("IVV 사도 돼?")
+        assert group == GROUP and embedding is None and answer is None
+    assert client.calls == 2
+
+    lookup("IVV 사도 돼?")
+    assert client.calls == 2  # 쉬는 동안은 호출 안 함
+
+    clock.now += 61
+    lookup("IVV 사도 돼?")
+    assert client.calls == 3
@@ -1,6 +1,28 @@
 const { useEffect, useRef, useState, useCallback } = React;
 const h = React.createElement;
 
+// ETag 조건부 GET: 서버가 304를 주면 마지막으로 받은 JSON 재사용
+const etagCache = new Map();
+
+const fetchJsonCached = async (url) => {
+  const cached = etagCache.get(url);
+  const headers = cached ? { "If-None-Match": cached.etag } : {};
+  // no-store: 브라우저 HTTP 캐시 대신 위 etagCache로만 재검증
+  const res = await fetch(url, { headers, cache: "no-store" });
+  if (res.status === 304 && cached) {
+    return { ok: true, status: 200, data: cached.data };
+  }
+  if (!res.ok) {
+    return { ok: false, status: res.status, res };
+  }
+  const data = await res.json();
+  const etag = res.headers.get("ETag");
+  if (etag) {
+    etagCache.set(url, { etag, data });
+  }
+  return { ok: true, status: res.status, data };
+};
+
 function App() {
   const [messages, setMessages] = useState([
     { role: "system", content: "You are a helpful assistant." }
@@ -107,10 +129,9 @@ function App() {
   const fetchSessions = useCallback(async () => {
     setSessionsLoading(true);
     try {
-      const res = await fetch("/api/ssessions");
-      if (!res.ok) throw new Error("세션 목록을 가져올 수 없습니다.");
-      const data = await res.json();
-      setSessions(data.sessions || []);
+      const result = await fetchJsonCached("/api/ssessions");
+      if (!result.ok) throw new Error("세션 목록을 가져올 수 없습니다.");
+      setSessions(result.data.sessions || []);
     } catch (e) {
       console.error("세션 목록 조회 실패:", e);
     } finally {
@@ -124,10 +145,9 @@ function App() {
 
     setLoading(true);
     try {
-      const res = await fetch(`/api/sessions/${sessionId}/messages`);
-      if (!res.ok) throw new Error("메시지를 가져올 수 없습니다.");
-      const data = await res.json();
-      setMessages(data.messages || [{ role: "system", content: "You are a helpful assistant." }]);
+      const result = await fetchJsonCached(`/api/sessions/${sessionId}/messages`);
+      if (!result.ok) throw new Error("메시지를 가져올 수 없습니다.");
+      setMessages(result.data.messages || [{ role: "system", content: "You are a helpful assistant." }]);
       sessionIdRef.current = sessionId;
       setCurrentSessionId(sessionId);
       lastReportMessageCountRef.current = null;
@@ -184,11 +204,12 @@ function App() {
     }
     try {
       const tryGetReport = async () => {
-        const res = await fetch(`/api/sessions/${sessionIdRef.current}/report`);
-        if (res.status === 404) {
+        const result = await fetchJsonCached(`/api/sessions/${sessionIdRef.current}/report`);
+        if (result.status === 404) {
           return null;
         }
-        if (!res.ok) {
+        if (!result.ok) {
+          const res = result.res;
           let detail = "";
           try {
             const j = await res.json();
@@ -198,7 +219,7 @@ function App() {
           }
           throw new Error(detail || `HTTP ${res.status}`);
         }
-        return await res.json();
+        return result.data;
       };
 
       const createReport = async () => {